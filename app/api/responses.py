@@ -0,0 +1,79 @@
+import hashlib
+from typing import Any, Dict, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+# Type adapters are built once per type; building them per response is the slow part
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """Get a cached TypeAdapter for a type."""
+    adapter = _adapters.get(tp)
+    if adapter is None:
+        adapter = TypeAdapter(tp)
+        _adapters[tp] = adapter
+    return adapter
+
+
+def dump_json(obj: Any) -> bytes:
+    """Serialize a pydantic model (or list of models) to JSON bytes."""
+    if isinstance(obj, list) and obj:
+        tp = list[type(obj[0])]
+    else:
+        tp = type(obj)
+    return get_type_adapter(tp).dump_json(obj)
+
+
+def compute_etag(body: bytes) -> str:
+    """Content-hash ETag; weak because compression may change the encoded bytes."""
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def json_response(
+    http_request: Request,
+    obj: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Build a JSON response with a content-hash ETag.
+
+    Args:
+        http_request: Incoming request, used for If-None-Match on GET/HEAD
+        obj: Pydantic model (or list of models) to serialize
+        status_code: Status code for a full response
+        headers: Extra response headers
+
+    Returns:
+        304 response if a GET/HEAD client already holds this content, else the JSON body
+    """
+    body = dump_json(obj)
+    etag = compute_etag(body)
+    response_headers = {"ETag": etag, **(headers or {})}
+
+    # 304 is only defined for GET/HEAD (RFC 9110 13.1.2); other methods always get the body
+    conditional = http_request.method in ("GET", "HEAD")
+    if conditional and _etag_matches(etag, http_request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=response_headers)
+
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=response_headers
+    )
@@ -1,11 +1,27 @@
-from fastapi import APIRouter, HTTPException,Request,BackgroundTasks
-from typing import Dict, Any
+import asyncio
+import json
+import time
+from fastapi import APIRouter, HTTPException,Request,BackgroundTasks,Header,WebSocket,WebSocketDisconnect,Query
+from pydantic import ValidationError
+from starlette.requests import HTTPConnection
+from fastapi.responses import Response
+from typing import Dict, Any, Optional
 from datetime import datetime
 
+from app.api.responses import json_response
 from app.models.response import ErrorResponse
-from app.models.schema import PostRequest, PostResponse
+from app.models.schema import PostRequest, PostResponse, RefineRequest, VariantsRequest, VariantsResponse
 from app.services.post_generator import PostGeneratorService
-from app.core.exceptions import AppException,APIKeyError,NewsSearchError
+from app.services.image_agent import sniff_image_type
+from app.core.exceptions import (
+    AppException,APIKeyError,NewsSearchError,IdempotencyConflictError,ExecutorSaturatedError,
+    SessionNotFoundError,RateLimitError,OverloadedError
+)
+from app.core.config import settings
+from app.core.executors import executor_stats
+from app.core.admission import admission_limiter
+from app.core.idempotency import idempotency_store, request_fingerprint
+from app.core.usage import USAGE_WINDOWS, RequestUsage, track_usage, usage_tracker
 from app.core.logging import get_logger
 
 
@@ -13,39 +29,96 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
-#initialize the PostGeneratorService
-post_service = PostGeneratorService()
 
-@router.post(
-    "/generate-post",
-    response_model=PostResponse,)
-async def generate_post(
-    request: PostRequest,
-    background_tasks: BackgroundTasks,
-) -> PostResponse:
-    '''Endpoint to generate a LinkedIn post based on the provided request parameters.'''
+def get_post_service(http_request: Request) -> PostGeneratorService:
+    """Get the PostGeneratorService constructed during application startup."""
+    post_service = getattr(http_request.app.state, "post_service", None)
+    if post_service is None:
+        startup_error = getattr(http_request.app.state, "startup_error", None)
+        raise APIKeyError(f"Post service unavailable: {startup_error or 'not initialized'}")
+    return post_service
 
-    try:
-        # # Log request metadata
-        # metadata = get_request_metadata(http_request)
-        logger.info(f"Post generation request: {request.topic} ")
-        
-        # Generate post
-        result = await post_service.generate_post(request)
-        
-        # Log success in background
-        background_tasks.add_task(
-            log_success_metrics,
-            request.topic,
-            len(result.linkedin_post),
-            len(result.news_sources)
+
+def get_client_id(http_request: HTTPConnection) -> str:
+    """
+    Identify the API client for usage accounting (X-Client-ID header, else IP).
+
+    The header is chosen by the caller, so budgets keyed on it only hold when a
+    trusted gateway sets it; with trust_client_id_header off the IP is used.
+    """
+    client_id = http_request.headers.get("x-client-id") if settings.trust_client_id_header else None
+    if client_id:
+        return client_id[:64]
+    return http_request.client.host if http_request.client else "unknown"
+
+
+async def run_idempotent(
+    http_request: Request,
+    idempotency_key: Optional[str],
+    payload: str,
+    factory,
+    result_type=None
+):
+    """Run a generation once per Idempotency-Key; returns (result, replayed)."""
+    if not idempotency_key:
+        return await factory(), False
+    
+    # Keys are chosen by clients, so two clients may pick the same one
+    key = f"{get_client_id(http_request)}:{http_request.url.path}:{idempotency_key}"
+    return await idempotency_store.run(key, request_fingerprint(payload), factory, result_type)
+
+
+def to_http_exception(e: Exception) -> HTTPException:
+    """Map service exceptions to HTTP errors."""
+    if isinstance(e, IdempotencyConflictError):
+        logger.warning(f"Idempotency conflict: {str(e)}")
+        return HTTPException(
+            status_code=409,
+            detail=ErrorResponse(
+                error=e.message,
+                code=e.code,
+                details=e.details
+            ).dict()
         )
-        
-        return result
-        
-    except APIKeyError as e:
+    
+    if isinstance(e, RateLimitError):
+        logger.warning(f"Rate limit: {str(e)}")
+        return HTTPException(
+            status_code=429,
+            detail=ErrorResponse(
+                error=e.message,
+                code=e.code,
+                details=e.details
+            ).dict(),
+            headers={"Retry-After": "60"}
+        )
+    
+    if isinstance(e, SessionNotFoundError):
+        logger.warning(f"Session error: {str(e)}")
+        return HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error=e.message,
+                code=e.code,
+                details=e.details
+            ).dict()
+        )
+    
+    if isinstance(e, ExecutorSaturatedError):
+        logger.warning(f"Executor saturated: {str(e)}")
+        return HTTPException(
+            status_code=503,
+            detail=ErrorResponse(
+                error="Service is at capacity, please retry",
+                code=e.code,
+                details=e.details
+            ).dict(),
+            headers={"Retry-After": "5"}
+        )
+    
+    if isinstance(e, APIKeyError):
         logger.error(f"API key error: {str(e)}")
-        raise HTTPException(
+        return HTTPException(
             status_code=500,
             detail=ErrorResponse(
                 error="Service configuration error",
@@ -53,10 +126,10 @@ async def generate_post(
                 details=e.details
             ).dict()
         )
-        
-    except NewsSearchError as e:
+    
+    if isinstance(e, NewsSearchError):
         logger.error(f"News search error: {str(e)}")
-        raise HTTPException(
+        return HTTPException(
             status_code=400,
             detail=ErrorResponse(
                 error="Failed to search for recent news",
@@ -64,11 +137,10 @@ async def generate_post(
                 details=e.details
             ).dict()
         )
-        
-        
-    except AppException as e:
+    
+    if isinstance(e, AppException):
         logger.error(f"Application error: {str(e)}")
-        raise HTTPException(
+        return HTTPException(
             status_code=400,
             detail=ErrorResponse(
                 error=e.message,
@@ -77,18 +149,251 @@ async def generate_post(
                 timestamp=datetime.utcnow().isoformat()  # Convert to ISO format string
             ).dict()
         )
+    
+    logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+    return HTTPException(
+        status_code=500,
+        detail=ErrorResponse(
+            error="An unexpected error occurred",
+            code="INTERNAL_ERROR",
+            details={"message": str(e)},
+            timestamp=datetime.utcnow().isoformat()  # Convert to ISO format string
+        ).dict()
+    )
+
+
+async def run_generation(
+    http_request: Request,
+    idempotency_key: Optional[str],
+    payload: str,
+    topic: str,
+    factory,
+    result_type
+):
+    """Run a generation with budget checks, usage tracking and idempotency; returns (result, replayed, usage)."""
+    client_id = get_client_id(http_request)
+    
+    async def start():
+        # Only new generations spend tokens; replays of stored results are not budgeted
+        await asyncio.to_thread(usage_tracker.check_budget, client_id)
+        return await factory()
+    
+    async with track_usage(topic, client_id) as usage:
+        result, replayed = await run_idempotent(http_request, idempotency_key, payload, start, result_type)
+    return result, replayed, usage
+
+
+def generation_headers(replayed: bool, usage: RequestUsage) -> Dict[str, str]:
+    """Response headers describing how a generation was served."""
+    headers = {"X-Usage-Tokens": str(usage.total_tokens)}
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return headers
+
+
+@router.post(
+    "/generate-post",
+    response_model=PostResponse,)
+async def generate_post(
+    request: PostRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+) -> Response:
+    '''Endpoint to generate a LinkedIn post based on the provided request parameters.'''
+
+    try:
+        # # Log request metadata
+        # metadata = get_request_metadata(http_request)
+        logger.info(f"Post generation request: {request.topic} ")
+        post_service = get_post_service(http_request)
+        
+        # Generate post (retries with the same Idempotency-Key share one run)
+        result, replayed, usage = await run_generation(
+            http_request,
+            idempotency_key,
+            request.model_dump_json(),
+            request.topic,
+            lambda: post_service.generate_post(request),
+            PostResponse
+        )
+        
+        # Log success in background
+        if not replayed:
+            background_tasks.add_task(
+                log_success_metrics,
+                request.topic,
+                len(result.linkedin_post),
+                len(result.news_sources)
+            )
+        
+        return json_response(http_request, result, headers=generation_headers(replayed, usage))
         
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=ErrorResponse(
-                error="An unexpected error occurred",
-                code="INTERNAL_ERROR",
-                details={"message": str(e)},
-                timestamp=datetime.utcnow().isoformat()  # Convert to ISO format string
-            ).dict()
+        raise to_http_exception(e)
+
+
+@router.post(
+    "/generate-variants",
+    response_model=VariantsResponse,)
+async def generate_variants(
+    request: VariantsRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+) -> Response:
+    '''Generate several style/length variants of a post from one news and image lookup.'''
+
+    try:
+        logger.info(f"Variants request: {request.topic} ({len(request.variants)} variants)")
+        post_service = get_post_service(http_request)
+        
+        result, replayed, usage = await run_generation(
+            http_request,
+            idempotency_key,
+            request.model_dump_json(),
+            request.topic,
+            lambda: post_service.generate_variants(request),
+            VariantsResponse
+        )
+        
+        return json_response(http_request, result, headers=generation_headers(replayed, usage))
+        
+    except Exception as e:
+        raise to_http_exception(e)
+
+
+@router.post(
+    "/sessions/{session_id}/regenerate",
+    response_model=PostResponse,)
+async def regenerate_post(
+    session_id: str,
+    request: RefineRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+) -> Response:
+    '''Regenerate or refine a session's post, reusing its cached news and image context.'''
+
+    try:
+        logger.info(f"Regenerate request for session {session_id}")
+        post_service = get_post_service(http_request)
+        
+        session = await post_service.sessions.get(session_id)
+        result, replayed, usage = await run_generation(
+            http_request,
+            idempotency_key,
+            request.model_dump_json(),
+            session.topic if session else session_id,
+            lambda: post_service.regenerate(session_id, request),
+            PostResponse
         )
+        
+        return json_response(http_request, result, headers=generation_headers(replayed, usage))
+        
+    except Exception as e:
+        raise to_http_exception(e)
+
+
+@router.get(
+    "/sessions/{session_id}",
+    response_model=PostResponse,)
+async def get_session_post(session_id: str, http_request: Request) -> Response:
+    '''Latest post of a session; poll with If-None-Match to get 304 while it is unchanged.'''
+
+    try:
+        post_service = get_post_service(http_request)
+        result = await post_service.get_session_post(session_id)
+        return json_response(http_request, result, headers={"Cache-Control": "private, no-cache"})
+        
+    except Exception as e:
+        raise to_http_exception(e)
+
+
+@router.websocket("/sessions/{session_id}/ws")
+async def session_websocket(websocket: WebSocket, session_id: str):
+    '''Interactive refinement: each JSON message is a RefineRequest, each reply a PostResponse.'''
+    await websocket.accept()
+    post_service = getattr(websocket.app.state, "post_service", None)
+    
+    async def send_invalid(errors):
+        await websocket.send_json({
+            "error": "Invalid request",
+            "code": "VALIDATION_ERROR",
+            "details": {"errors": errors}
+        })
+    
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            try:
+                message = json.loads(frame.get("text") or frame.get("bytes") or "")
+            except ValueError:
+                await send_invalid(["Message must be valid JSON"])
+                continue
+            if not isinstance(message, dict):
+                await send_invalid(["Message must be a JSON object"])
+                continue
+            
+            try:
+                if post_service is None:
+                    raise APIKeyError("Post service unavailable")
+                request = RefineRequest(**message)
+                client_id = get_client_id(websocket)
+                await asyncio.to_thread(usage_tracker.check_budget, client_id)
+                # The admission middleware only sees the handshake, so each message is admitted here
+                if not admission_limiter.try_acquire():
+                    raise OverloadedError(admission_limiter.retry_after())
+                started = time.perf_counter()
+                success = False
+                try:
+                    session = await post_service.sessions.get(session_id)
+                    async with track_usage(session.topic if session else session_id, client_id):
+                        result = await post_service.regenerate(session_id, request)
+                    success = True
+                except SessionNotFoundError:
+                    success = True
+                    raise
+                finally:
+                    admission_limiter.release(time.perf_counter() - started, success)
+                await websocket.send_json(result.model_dump(mode="json"))
+            except ValidationError as e:
+                await send_invalid([error["msg"] for error in e.errors()])
+            except AppException as e:
+                await websocket.send_json({"error": e.message, "code": e.code, "details": e.details})
+    except WebSocketDisconnect:
+        logger.info(f"Session websocket closed for {session_id}")
+
+
+@router.get(
+    "/usage",
+    summary="Usage Statistics",
+    description="Token, SerpAPI call and cost accounting per topic and per client over a rolling window."
+)
+async def usage_stats(
+    window: str = Query(default="1h", pattern=f"^({'|'.join(USAGE_WINDOWS)})$")
+) -> Dict[str, Any]:
+    """Usage statistics endpoint."""
+    return await asyncio.to_thread(usage_tracker.stats, window)
+
+
+@router.get(
+    "/images/{digest}",
+    summary="Cached Thumbnail",
+    description="Serve a locally cached image thumbnail by content digest."
+)
+async def get_thumbnail(digest: str, http_request: Request) -> Response:
+    """Serve a cached thumbnail; content-addressed, so it never changes."""
+    post_service = getattr(http_request.app.state, "post_service", None)
+    data = post_service.image_service.get_thumbnail(digest) if post_service else None
+    if data is None:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    
+    return Response(
+        content=data,
+        media_type=sniff_image_type(data) or "application/octet-stream",
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{digest}"'}
+    )
 
 
 @router.get(
@@ -96,17 +401,25 @@ async def generate_post(
     summary="Health Check",
     description="Check if the service is healthy and all dependencies are working."
 )
-async def health_check() -> Dict[str, Any]:
+async def health_check(http_request: Request) -> Dict[str, Any]:
     """Health check endpoint."""
     try:
         # Basic health check
         # await validate_api_keys()
+        state = http_request.app.state
+        post_service = getattr(state, "post_service", None)
+        service_ready = post_service is not None
         
         return {
-            "status": "healthy",
+            "status": "healthy" if service_ready else "degraded",
             "service": "LinkedIn Post Generator",
             "version": "1.0.0",
-            "timestamp": "2023-12-01T00:00:00Z"
+            "timestamp": datetime.utcnow().isoformat(),
+            "startup": getattr(state, "startup_metrics", None),
+            "startup_error": getattr(state, "startup_error", None),
+            "executors": executor_stats(),
+            "admission": admission_limiter.stats(),
+            "models": post_service.ai_agent.router.stats() if service_ready else None
         }
         
     except Exception as e:
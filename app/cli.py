@@ -0,0 +1,195 @@
+"""
+Offline bulk generation.
+
+Reads topics (one per line) from a file or stdin, generates posts with
+bounded concurrency and streams one JSON line per topic as it completes.
+
+    python -m app.cli topics.txt -o posts.jsonl --concurrency 8 --resume
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.executors import shutdown_executors
+from app.core.http import close_http_client, open_http_client
+from app.core.usage import track_usage
+from app.models.requests import ALLOWED_STYLES
+from app.models.schema import PostRequest
+from app.services.post_generator import PostGeneratorService
+
+logger = logging.getLogger("app.cli")
+
+
+def read_topics(lines: Iterable[str]) -> List[str]:
+    """Unique topics in input order, skipping blanks and # comments."""
+    topics = []
+    for line in lines:
+        topic = line.strip()
+        if topic and not topic.startswith("#"):
+            topics.append(topic)
+    return list(dict.fromkeys(topics))
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Topics already generated successfully in an existing output file."""
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as existing:
+            for line in existing:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Partial last line from an interrupted run
+                if record.get("status") == "ok":
+                    done.add(record["topic"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def generate_one(service: PostGeneratorService, topic: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate one post and describe the outcome as a JSONL record."""
+    started = time.perf_counter()
+    record: Dict[str, Any] = {"topic": topic}
+    try:
+        request = PostRequest(
+            topic=topic,
+            style=args.style,
+            max_length=args.max_length,
+            include_hashtags=not args.no_hashtags
+        )
+        async with track_usage(topic, "cli") as usage:
+            result = await service.generate_post(request)
+        record.update(status="ok", result=result.model_dump(mode="json"), tokens=usage.total_tokens)
+    except ValidationError as e:
+        record.update(status="error", error={"code": "VALIDATION_ERROR", "message": str(e)})
+    except Exception as e:
+        record.update(status="error", error={"code": getattr(e, "code", "INTERNAL_ERROR"), "message": str(e)})
+    record["latency"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+async def run(args: argparse.Namespace, topics: List[str], output: TextIO) -> Dict[str, Any]:
+    """Drive PostGeneratorService over topics with bounded concurrency."""
+    await open_http_client()
+    try:
+        service = PostGeneratorService()
+        if not args.no_warm_up:
+            await service.warm_up(settings.startup_probe_timeout)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for topic in topics:
+            queue.put_nowait(topic)
+
+        latencies: List[float] = []
+        counts = {"ok": 0, "error": 0, "tokens": 0}
+
+        async def worker() -> None:
+            while True:
+                try:
+                    topic = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                record = await generate_one(service, topic, args)
+                # Each line is flushed on completion so an interrupted run can resume
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                counts[record["status"]] += 1
+                counts["tokens"] += record.get("tokens", 0)
+                latencies.append(record["latency"])
+                if record["status"] == "error":
+                    logger.warning(f"Failed: {topic}: {record['error']['message']}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(args.concurrency, len(topics)) or 1)))
+        elapsed = time.perf_counter() - started
+
+        return {
+            "completed": counts["ok"],
+            "failed": counts["error"],
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput_per_minute": round(60 * len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "latency_p50": round(percentile(latencies, 0.5), 3),
+            "latency_p95": round(percentile(latencies, 0.95), 3),
+            "latency_max": round(max(latencies, default=0.0), 3),
+            "tokens": counts["tokens"]
+        }
+    finally:
+        await close_http_client()
+        shutdown_executors()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Bulk LinkedIn post generation")
+    parser.add_argument("input", nargs="?", default="-", help="Topics file, one per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Topics generated concurrently")
+    parser.add_argument("--resume", action="store_true", help="Skip topics already completed in the output file")
+    parser.add_argument("--style", default="professional", choices=ALLOWED_STYLES)
+    parser.add_argument("--max-length", type=int, default=2000)
+    parser.add_argument("--no-hashtags", action="store_true")
+    parser.add_argument("--no-warm-up", action="store_true", help="Skip the upstream warm-up probe")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+    if args.resume and args.output == "-":
+        parser.error("--resume needs an output file")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # Logs go to stderr so stdout can carry JSONL
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=getattr(logging, args.log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    if args.input == "-":
+        topics = read_topics(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8") as topics_file:
+            topics = read_topics(topics_file)
+
+    skipped = 0
+    if args.resume:
+        done = load_checkpoint(args.output)
+        skipped = sum(1 for topic in topics if topic in done)
+        topics = [topic for topic in topics if topic not in done]
+
+    output = sys.stdout if args.output == "-" else open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    if args.resume and output.tell():
+        # Terminate a partial line left by an interrupted run
+        with open(args.output, "rb") as existing:
+            existing.seek(-1, 2)
+            if existing.read(1) != b"\n":
+                output.write("\n")
+    try:
+        summary = asyncio.run(run(args, topics, output)) if topics else {"completed": 0, "failed": 0}
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    summary["skipped"] = skipped
+    print(json.dumps({"summary": summary}), file=sys.stderr)
+    return 1 if summary.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
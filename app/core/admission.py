@@ -0,0 +1,147 @@
+import math
+import time
+from typing import Any, Dict, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.response import ErrorResponse
+
+logger = get_logger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit driven by observed latency.
+
+    The limit grows by roughly one per limit's worth of fast, successful
+    requests and shrinks multiplicatively when latency passes the target or
+    requests fail, so excess load is shed instead of queueing until timeout.
+    The limit is cut at most once per latency window: only requests admitted
+    after the last cut can trigger another one.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        target_latency: float,
+        backoff: float = 0.9
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self._last_backoff = float("-inf")
+        self._accepted = 0
+        self._rejected = 0
+        self._failed = 0
+
+    def try_acquire(self) -> bool:
+        """Admit a request if below the current limit."""
+        if self.in_flight >= max(int(self.limit), 1):
+            self._rejected += 1
+            return False
+        self.in_flight += 1
+        self._accepted += 1
+        return True
+
+    def release(self, latency: float, success: bool) -> None:
+        """Record a finished request (latency measured with time.perf_counter) and adjust the limit."""
+        self.in_flight -= 1
+        self.latency_ewma = latency if not self.latency_ewma else 0.8 * self.latency_ewma + 0.2 * latency
+
+        if not success or latency > self.target_latency:
+            if not success:
+                self._failed += 1
+            # Requests already in flight at the last cut reflect the old limit
+            now = time.perf_counter()
+            if now - latency >= self._last_backoff:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_backoff = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only probe upwards while the limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying."""
+        return max(1, math.ceil(self.latency_ewma or self.target_latency / 2))
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of limiter state."""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "accepted": self._accepted,
+            "rejected": self._rejected,
+            "failed": self._failed,
+            "latency_ewma_seconds": round(self.latency_ewma, 3)
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Shed load on expensive endpoints before they start work.
+
+    Only non-GET requests under the configured prefixes are limited; everything
+    else (health checks, docs, session reads) passes straight through so it
+    stays responsive.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: AdaptiveConcurrencyLimiter, paths: Tuple[str, ...]):
+        self.app = app
+        self.limiter = limiter
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Reads (session polls) are cheap and would skew the latency signal
+        if (
+            scope["type"] != "http"
+            or scope["method"] in ("GET", "HEAD")
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire():
+            retry_after = self.limiter.retry_after()
+            logger.warning(f"Admission control rejected {scope['path']} (limit {self.limiter.limit:.1f})")
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": ErrorResponse(
+                    error="Service is overloaded, please retry later",
+                    code="OVERLOADED",
+                    details={"retry_after": retry_after}
+                ).dict()},
+                headers={"Retry-After": str(retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.limiter.release(time.perf_counter() - started, status_code < 500)
+
+
+admission_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=settings.admission_initial_limit,
+    min_limit=settings.admission_min_limit,
+    max_limit=settings.admission_max_limit,
+    target_latency=settings.admission_target_latency
+)
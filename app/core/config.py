@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic_settings import BaseSettings
 
 
@@ -13,19 +13,115 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     
     # API Keys
-    google_api_key: str
+    google_api_key: Optional[str] = None
     serpapi_api_key: Optional[str] = None
+    
+    # Upstream providers: live, record (live + save to cassettes) or replay (offline)
+    provider_mode: str = "live"
+    cassette_dir: str = ".cassettes"
+    replay_latency_scale: float = 0.0
 
     
     
     # News search settings
     max_news_results: int = 5
     news_search_days: int = 7
+    news_refresh_interval: int = 300
+    news_store_max_topics: int = 1000
     
     # AI Generation settings
+    llm_model: str = "gemini-2.5-flash"
+    llm_light_model: str = "gemini-2.5-flash-lite"
+    llm_short_post_chars: int = 800
+    llm_hashtag_temperature: float = 0.3
+    
+    # Output length control: character budgets map to max-output-token limits.
+    # Thinking tokens count against the limit, so the budget is added on top.
+    llm_chars_per_token: float = 4.0
+    llm_output_token_margin: float = 1.25
+    llm_thinking_budget: Optional[int] = 0
+    llm_stream_posts: bool = True
+    
+    # Model routing health (rolling window per model)
+    llm_stats_window: int = 50
+    llm_stats_max_age: float = 300.0  # Seconds before a sample stops counting, so demoted models recover
+    llm_min_samples: int = 5
+    llm_max_error_rate: float = 0.5
+    llm_latency_budget: float = 30.0
     max_post_length: int = 3000
     temperature: float = 0.7
     
+    # Startup settings
+    startup_probe: bool = True
+    startup_probe_timeout: float = 10.0
+    startup_probe_all_routes: bool = False  # One billed probe per (model, temperature) instead of per model
+    
+    # Outbound HTTP settings
+    http_timeout: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    
+    # Response settings
+    compression_min_size: int = 1024
+    
+    # Article enrichment (full-text fetch of top news articles)
+    article_enrichment: bool = False
+    article_fetch_limit: int = 3
+    article_fetch_timeout: float = 4.0
+    article_max_bytes: int = 524_288
+    article_max_text: int = 20_000
+    article_key_sentences: int = 5
+    article_cache_dir: Optional[str] = None
+    article_cache_ttl: int = 604_800
+    article_failure_ttl: int = 300
+    
+    # Image search settings (cache disabled unless a directory is set)
+    image_candidates: int = 8
+    image_min_width: int = 600
+    image_max_bytes: int = 15_000_000
+    image_validation_timeout: float = 2.5
+    image_cache_dir: Optional[str] = None
+    image_cache_ttl: int = 86400
+    image_thumbnail_max_bytes: int = 262_144
+    
+    # Pipeline executor settings (full_policy: wait, fail or degrade)
+    search_pool_workers: int = 8
+    search_pool_queue: int = 32
+    llm_pool_workers: int = 8
+    llm_pool_queue: int = 32
+    executor_full_policy: str = "wait"
+    
+    # Usage accounting: USD per 1M (input, output) tokens and per SerpAPI search
+    llm_pricing: Dict[str, Tuple[float, float]] = {
+        "gemini-2.5-flash": (0.30, 2.50),
+        "gemini-2.5-flash-lite": (0.10, 0.40)
+    }
+    serpapi_cost_per_call: float = 0.015
+    
+    # Optional per-client hourly token budgets (X-Client-ID header, else client IP).
+    # X-Client-ID is self-declared; turn trust off unless a gateway sets it.
+    client_token_budget_per_hour: Optional[int] = None
+    client_token_budgets: Dict[str, int] = {}
+    trust_client_id_header: bool = True
+    
+    # Admission control settings (limits are per worker)
+    admission_paths: List[str] = ["/posts/generate-post", "/posts/generate-variants", "/posts/sessions/"]
+    admission_initial_limit: int = 8
+    admission_min_limit: int = 2
+    admission_max_limit: int = 64
+    admission_target_latency: float = 20.0
+    
+    # Generation sessions for regenerate/refine (shared through state_dir)
+    session_ttl_seconds: int = 1800
+    session_max_entries: int = 1000
+    
+    # Idempotency settings
+    idempotency_ttl_seconds: int = 3600
+    idempotency_max_entries: int = 1000
+    
+    # Directory shared by all workers on the host; None keeps this state per worker
+    state_dir: Optional[str] = ".state"
+    
     class Config:
         """Pydantic config."""
         env_file = ".env"
@@ -41,4 +41,47 @@ class RateLimitError(AppException):
     """Rate limiting errors."""
     
     def __init__(self, message: str = "Rate limit exceeded"):
-        super().__init__(message, "RATE_LIMIT_ERROR")
\ No newline at end of file
+        super().__init__(message, "RATE_LIMIT_ERROR")
+
+
+class ExecutorSaturatedError(AppException):
+    """Pipeline executor queue is full."""
+    
+    def __init__(self, executor: str):
+        super().__init__(
+            f"Executor '{executor}' is at capacity",
+            "EXECUTOR_SATURATED",
+            {"executor": executor}
+        )
+
+
+class OverloadedError(AppException):
+    """Admission control is shedding load."""
+    
+    def __init__(self, retry_after: int):
+        super().__init__(
+            "Service is overloaded, please retry later",
+            "OVERLOADED",
+            {"retry_after": retry_after}
+        )
+
+
+class CassetteMissError(AppException):
+    """Replay mode found no recording for an upstream call."""
+    
+    def __init__(self, message: str = "No recorded response for upstream call"):
+        super().__init__(message, "CASSETTE_MISS")
+
+
+class SessionNotFoundError(AppException):
+    """Generation session missing or expired."""
+    
+    def __init__(self, message: str = "Session not found or expired"):
+        super().__init__(message, "SESSION_NOT_FOUND")
+
+
+class IdempotencyConflictError(AppException):
+    """Idempotency key reused with a different request."""
+    
+    def __init__(self, message: str = "Idempotency-Key was already used with a different request"):
+        super().__init__(message, "IDEMPOTENCY_CONFLICT")
\ No newline at end of file
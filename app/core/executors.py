@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.exceptions import ExecutorSaturatedError
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+FULL_POLICIES = ("wait", "fail", "degrade")
+
+
+class BoundedExecutor:
+    """
+    Named thread pool with a bounded queue and usage statistics.
+
+    Blocking upstream calls (SerpAPI, Gemini) run here instead of the event
+    loop's shared default executor, so one slow stage cannot starve another.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, full_policy: str = "wait"):
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"full_policy must be one of: {', '.join(FULL_POLICIES)}")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.full_policy = full_policy
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._created_at = time.monotonic()
+
+        # Counters
+        self._pending = 0
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._degraded = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._busy_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, fallback: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Run a blocking callable in the pool.
+
+        Args:
+            fn: Blocking callable
+            *args: Arguments for fn
+            fallback: Cheap substitute used by the "degrade" policy when the pool is full
+
+        Returns:
+            Result of fn (or of fallback when degraded)
+
+        Raises:
+            ExecutorSaturatedError: If the pool is full and the policy does not wait
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+
+        if self._slots.locked() and self.full_policy != "wait":
+            if self.full_policy == "degrade" and fallback is not None:
+                self._degraded += 1
+                logger.warning(f"Executor '{self.name}' full, degrading to fallback")
+                return fallback()
+            self._rejected += 1
+            raise ExecutorSaturatedError(self.name)
+
+        await self._slots.acquire()
+        self._pending += 1
+        self._submitted += 1
+        submitted_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, submitted_at, fn, args)
+        finally:
+            self._pending -= 1
+            self._slots.release()
+
+    def _timed(self, submitted_at: float, fn: Callable[..., Any], args: tuple) -> Any:
+        """Run fn in a worker thread, recording queue wait and busy time."""
+        started = time.perf_counter()
+        wait = started - submitted_at
+        with self._lock:
+            self._active += 1
+            self._queue_wait_total += wait
+            self._queue_wait_max = max(self._queue_wait_max, wait)
+        failed = False
+        try:
+            return fn(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._busy_seconds += time.perf_counter() - started
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue and utilization statistics."""
+        with self._lock:
+            started = self._completed + self._failed + self._active
+            elapsed = max(time.monotonic() - self._created_at, 1e-9)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "full_policy": self.full_policy,
+                "active": self._active,
+                "queued": max(self._pending - self._active, 0),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "degraded": self._degraded,
+                "avg_queue_wait_ms": round(1000 * self._queue_wait_total / started, 2) if started else 0.0,
+                "max_queue_wait_ms": round(1000 * self._queue_wait_max, 2),
+                "utilization": round(self._busy_seconds / (elapsed * self.max_workers), 4)
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """
+    Get a named pipeline executor ("search" or "llm"), creating it on first use.
+
+    Threads start lazily, so creating executors is safe before a preload fork.
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        pool_settings = {
+            "search": (settings.search_pool_workers, settings.search_pool_queue),
+            "llm": (settings.llm_pool_workers, settings.llm_pool_queue)
+        }
+        if name not in pool_settings:
+            raise ValueError(f"Unknown executor: {name}")
+        max_workers, max_queue = pool_settings[name]
+        executor = BoundedExecutor(name, max_workers, max_queue, settings.executor_full_policy)
+        _executors[name] = executor
+    return executor
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistics for every executor created so far."""
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+def shutdown_executors() -> None:
+    """Shut down all executors."""
+    for executor in _executors.values():
+        executor.shutdown()
+    _executors.clear()
@@ -0,0 +1,47 @@
+from typing import Optional
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Shared client so outbound requests reuse pooled connections
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP client from settings."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.http_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive
+        ),
+        follow_redirects=True,
+        headers={"User-Agent": f"{settings.app_name}/{settings.app_version}"}
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it if needed."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Open the shared HTTP client at startup."""
+    client = get_http_client()
+    logger.info("Shared HTTP client ready")
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client at shutdown."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("Shared HTTP client closed")
+    _client = None
@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.exceptions import IdempotencyConflictError
+from app.core.logging import get_logger
+from app.utils.content_store import ContentStore, content_hash
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _IdempotencyEntry:
+    """In-flight or completed work registered under an Idempotency-Key."""
+    fingerprint: str
+    task: asyncio.Future
+
+
+def request_fingerprint(payload: str) -> str:
+    """Hash the request body so a key cannot be reused for a different request."""
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Store mapping Idempotency-Key values to generation tasks and results.
+
+    Retries attach to the running task or receive its stored result, so an
+    expensive generation runs once per key within the TTL. Running tasks are
+    per process; completed results are also written to a directory shared by
+    the workers on the host, so a retry routed to another worker replays them.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, store_dir: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self._entries = TTLCache(ttl_seconds, max_entries)
+        self._results: Optional[ContentStore] = None
+        if store_dir:
+            self._results = ContentStore(str(Path(store_dir) / "idempotency"), suffix=".json")
+        self._last_prune = 0.0
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        factory: Callable[[], Awaitable[Any]],
+        result_type: Optional[Type[BaseModel]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run work once per key.
+
+        Args:
+            key: Idempotency key, already namespaced by the caller
+            fingerprint: Hash of the request payload
+            factory: Creates the coroutine to run on first use of the key
+            result_type: Model to rebuild results stored by other workers; without it
+                results are only shared within this process
+
+        Returns:
+            Tuple of (result, replayed) where replayed is True for retries
+
+        Raises:
+            IdempotencyConflictError: If the key was used with a different payload
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflictError()
+            logger.info(f"Idempotency key {key} attached to existing generation")
+            return await asyncio.shield(entry.task), True
+
+        if self._results is not None and result_type is not None:
+            stored = await asyncio.to_thread(self._load, key)
+            if stored is not None:
+                if stored["fingerprint"] != fingerprint:
+                    raise IdempotencyConflictError()
+                logger.info(f"Idempotency key {key} replayed from shared store")
+                return result_type.model_validate(stored["result"]), True
+
+        # Own the work in a task so a disconnecting client does not cancel it
+        task = asyncio.ensure_future(factory())
+        entry = _IdempotencyEntry(fingerprint=fingerprint, task=task)
+        self._entries.set(key, entry)
+        task.add_done_callback(lambda t: self._on_done(key, entry, result_type))
+        return await asyncio.shield(task), False
+
+    def _on_done(self, key: str, entry: _IdempotencyEntry, result_type: Optional[Type[BaseModel]]) -> None:
+        """Forget failed work so the next retry runs it again; share successful results."""
+        task = entry.task
+        if task.cancelled() or task.exception() is not None:
+            if self._entries.get(key) is entry:
+                self._entries.pop(key)
+            return
+
+        if self._results is not None and result_type is not None:
+            record = {
+                "fingerprint": entry.fingerprint,
+                "result": task.result().model_dump(mode="json"),
+                "stored_at": time.time()
+            }
+            asyncio.get_running_loop().run_in_executor(None, self._save, key, record)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a result stored by any worker, if not expired."""
+        digest = content_hash(key)
+        record = self._results.get_json(digest)
+        if record is None:
+            return None
+        if time.time() - record.get("stored_at", 0) >= self.ttl_seconds:
+            self._results.delete(digest)
+            return None
+        return record
+
+    def _save(self, key: str, record: Dict[str, Any]) -> None:
+        """Write a completed result for other workers, pruning expired ones now and then."""
+        try:
+            self._results.put_json(content_hash(key), record)
+            if time.time() - self._last_prune > self.ttl_seconds:
+                self._last_prune = time.time()
+                self._results.prune(self.ttl_seconds)
+        except OSError as e:
+            logger.warning(f"Failed to store idempotent result for {key}: {str(e)}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    max_entries=settings.idempotency_max_entries,
+    store_dir=settings.state_dir
+)
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import RateLimitError
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+USAGE_WINDOWS = {"5m": 300, "1h": 3600, "24h": 86400}
+
+
+@dataclass
+class RequestUsage:
+    """Upstream usage accumulated while serving one request."""
+    topic: str
+    client_id: str
+    llm_calls: int = 0
+    hashtag_fallback_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    serpapi_calls: int = 0
+    cost_usd: float = 0.0
+    by_model: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add_llm_call(self, task: str, model: str, usage: Dict[str, Any]) -> None:
+        input_tokens = int(usage.get("input_tokens", 0) or 0)
+        output_tokens = int(usage.get("output_tokens", 0) or 0)
+        self.llm_calls += 1
+        if task == "hashtags":
+            self.hashtag_fallback_calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+        model_usage = self.by_model.setdefault(model, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+        model_usage["calls"] += 1
+        model_usage["input_tokens"] += input_tokens
+        model_usage["output_tokens"] += output_tokens
+
+        input_price, output_price = settings.llm_pricing.get(model, (0.0, 0.0))
+        self.cost_usd += (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def add_search_call(self) -> None:
+        self.serpapi_calls += 1
+        self.cost_usd += settings.serpapi_cost_per_call
+
+
+# Usage of the request being served; asyncio tasks inherit it when created
+_current_usage: ContextVar[Optional[RequestUsage]] = ContextVar("current_usage", default=None)
+
+
+def record_llm_call(task: str, model: str, usage: Dict[str, Any]) -> None:
+    """Attach one model call's usage metadata to the current request, if any."""
+    current = _current_usage.get()
+    if current is not None:
+        current.add_llm_call(task, model, usage)
+
+
+def record_search_call() -> None:
+    """Count one SerpAPI call against the current request, if any."""
+    current = _current_usage.get()
+    if current is not None:
+        current.add_search_call()
+
+
+class UsageTracker:
+    """
+    Rolling per-topic and per-client aggregation of request usage.
+
+    With a state directory, usage is recorded in a SQLite database that every
+    worker on the host writes to, so statistics and token budgets cover all
+    workers; without one they only cover this process.
+    """
+
+    def __init__(self, retention_seconds: int = max(USAGE_WINDOWS.values()), store_dir: Optional[str] = None):
+        self.retention_seconds = retention_seconds
+        self._events: Deque[Tuple[float, RequestUsage]] = deque()
+        self._lock = threading.Lock()
+        self._db_path = str(Path(store_dir) / "usage.sqlite3") if store_dir else None
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self._last_prune = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection for this process (callers hold the lock); workers forked after import reconnect."""
+        if self._db is None or self._db_pid != os.getpid():
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self._db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS usage_events ("
+                "ts REAL NOT NULL, client_id TEXT NOT NULL, total_tokens INTEGER NOT NULL, usage TEXT NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS usage_events_ts ON usage_events (ts)")
+            db.execute("CREATE INDEX IF NOT EXISTS usage_events_client ON usage_events (client_id, ts)")
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def record(self, usage: RequestUsage) -> None:
+        now = time.time()
+        with self._lock:
+            if self._db_path is None:
+                self._events.append((now, usage))
+                while self._events and self._events[0][0] < now - self.retention_seconds:
+                    self._events.popleft()
+                return
+
+            db = self._connection()
+            db.execute(
+                "INSERT INTO usage_events (ts, client_id, total_tokens, usage) VALUES (?, ?, ?, ?)",
+                (now, usage.client_id, usage.total_tokens, json.dumps(asdict(usage)))
+            )
+            if now - self._last_prune > 60:
+                self._last_prune = now
+                db.execute("DELETE FROM usage_events WHERE ts < ?", (now - self.retention_seconds,))
+
+    def _since(self, since: float) -> List[RequestUsage]:
+        """Usage recorded since a timestamp."""
+        with self._lock:
+            if self._db_path is None:
+                return [u for ts, u in self._events if ts >= since]
+            rows = self._connection().execute("SELECT usage FROM usage_events WHERE ts >= ?", (since,))
+            return [RequestUsage(**json.loads(row[0])) for row in rows]
+
+    def client_tokens(self, client_id: str, seconds: int) -> int:
+        """Tokens used by a client within the last `seconds`."""
+        since = time.time() - seconds
+        with self._lock:
+            if self._db_path is None:
+                return sum(u.total_tokens for ts, u in self._events if ts >= since and u.client_id == client_id)
+            row = self._connection().execute(
+                "SELECT COALESCE(SUM(total_tokens), 0) FROM usage_events WHERE client_id = ? AND ts >= ?",
+                (client_id, since)
+            ).fetchone()
+            return row[0]
+
+    def check_budget(self, client_id: str) -> None:
+        """
+        Enforce the client's hourly token budget.
+
+        Raises:
+            RateLimitError: If the client has used its budget for the last hour
+        """
+        budget = settings.client_token_budgets.get(client_id, settings.client_token_budget_per_hour)
+        if not budget:
+            return
+        used = self.client_tokens(client_id, 3600)
+        if used >= budget:
+            logger.warning(f"Client {client_id} over token budget ({used}/{budget})")
+            error = RateLimitError(f"Token budget of {budget} per hour exceeded")
+            error.details = {"client_id": client_id, "used_tokens": used, "budget_tokens": budget}
+            raise error
+
+    def stats(self, window: str = "1h", top: int = 20) -> Dict[str, Any]:
+        """Aggregated usage over a window, overall and per topic and client."""
+        events = self._since(time.time() - USAGE_WINDOWS[window])
+
+        def empty() -> Dict[str, Any]:
+            return {
+                "requests": 0, "llm_calls": 0, "hashtag_fallback_calls": 0, "input_tokens": 0,
+                "output_tokens": 0, "serpapi_calls": 0, "cost_usd": 0.0
+            }
+
+        def add(bucket: Dict[str, Any], usage: RequestUsage) -> None:
+            bucket["requests"] += 1
+            bucket["llm_calls"] += usage.llm_calls
+            bucket["hashtag_fallback_calls"] += usage.hashtag_fallback_calls
+            bucket["input_tokens"] += usage.input_tokens
+            bucket["output_tokens"] += usage.output_tokens
+            bucket["serpapi_calls"] += usage.serpapi_calls
+            bucket["cost_usd"] = round(bucket["cost_usd"] + usage.cost_usd, 6)
+
+        totals = empty()
+        by_topic: Dict[str, Dict[str, Any]] = {}
+        by_client: Dict[str, Dict[str, Any]] = {}
+        by_model: Dict[str, Dict[str, int]] = {}
+        for usage in events:
+            add(totals, usage)
+            add(by_topic.setdefault(usage.topic.lower(), empty()), usage)
+            add(by_client.setdefault(usage.client_id, empty()), usage)
+            for model, model_usage in usage.by_model.items():
+                bucket = by_model.setdefault(model, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+                for name, value in model_usage.items():
+                    bucket[name] += value
+
+        def top_n(buckets: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+            ranked = sorted(buckets.items(), key=lambda item: item[1]["cost_usd"], reverse=True)
+            return dict(ranked[:top])
+
+        return {
+            "window": window,
+            "totals": totals,
+            "by_model": by_model,
+            "by_topic": top_n(by_topic),
+            "by_client": top_n(by_client)
+        }
+
+
+usage_tracker = UsageTracker(store_dir=settings.state_dir)
+
+
+@asynccontextmanager
+async def track_usage(topic: str, client_id: str) -> AsyncIterator[RequestUsage]:
+    """Collect upstream usage for the enclosed work and record it when done."""
+    usage = RequestUsage(topic=topic, client_id=client_id)
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+        await asyncio.to_thread(usage_tracker.record, usage)
@@ -1,18 +1,62 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI,Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
-import time
 from typing import List 
 
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
 from app.core.exceptions import AppException
+from app.core.http import open_http_client, close_http_client
+from app.core.executors import shutdown_executors
+from app.core.admission import AdmissionControlMiddleware, admission_limiter
 from app.api.routes import router as post_router
+from app.services.post_generator import PostGeneratorService
 
 setup_logging()
 logger = get_logger(__name__)
 
+
+async def startup_services(app: FastAPI) -> None:
+    """
+    Construct services and warm up upstream connections.
+    
+    Runs inside each worker after fork, so with gunicorn --preload the heavy
+    imports are shared while clients and sockets stay per-process.
+    """
+    started = time.perf_counter()
+    app.state.post_service = None
+    app.state.startup_error = None
+    
+    await open_http_client()
+    
+    try:
+        app.state.post_service = PostGeneratorService()
+    except Exception as e:
+        # Keep the worker alive; requests report the configuration error
+        logger.error(f"Failed to initialize post service: {str(e)}")
+        app.state.startup_error = str(e)
+    construct_done = time.perf_counter()
+    
+    probe_ok = None
+    if app.state.post_service is not None and settings.startup_probe:
+        probe_ok = await app.state.post_service.warm_up(settings.startup_probe_timeout)
+    finished = time.perf_counter()
+    
+    app.state.startup_metrics = {
+        "import_seconds": round(_app_created - _import_started, 3),
+        "service_init_seconds": round(construct_done - started, 3),
+        "warm_up_seconds": round(finished - construct_done, 3),
+        "startup_seconds": round(finished - started, 3),
+        "warm_up_ok": probe_ok
+    }
+    logger.info(f"Startup metrics: {app.state.startup_metrics}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
      
@@ -21,20 +65,34 @@ async def lifespan(app: FastAPI):
     logger.info("Starting LinkedIn Post Generator API")
     logger.info(f"Debug mode: {settings.debug}")
     logger.info(f"Log level: {settings.log_level}")
+    await startup_services(app)
     
     yield
     
     # Shutdown
     logger.info("Shutting down LinkedIn Post Generator API")
+    await close_http_client()
+    shutdown_executors()
 
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Admission control for expensive generation endpoints
+app.add_middleware(
+    AdmissionControlMiddleware,
+    limiter=admission_limiter,
+    paths=tuple(settings.admission_paths)
+)
+
+# Compression middleware
+app.add_middleware(GZipMiddleware, minimum_size=settings.compression_min_size)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +104,8 @@ app.add_middleware(
 # Include API router
 app.include_router(post_router)
 
+_app_created = time.perf_counter()
+
 
 # Root endpoint
 @app.get("/")
@@ -1,18 +1,20 @@
 from typing import Optional
 from pydantic import BaseModel, Field, validator
 
+ALLOWED_STYLES = ["professional", "casual", "thought-leadership"]
 
-class GeneratePostRequest(BaseModel):
-    """Request model for generating LinkedIn post."""
-    
-    topic: str = Field(
-        ...,
-        min_length=3,
-        max_length=100,
-        description="Topic to search news for and generate post about"
-    )
+
+def validate_style_value(v: Optional[str]) -> Optional[str]:
+    """Check a style against ALLOWED_STYLES (None means not set)."""
+    if v is not None and v not in ALLOWED_STYLES:
+        raise ValueError(f"Style must be one of: {', '.join(ALLOWED_STYLES)}")
+    return v
+
+
+class PostOptions(BaseModel):
+    """Style and length options for one generated post."""
     
-    style: Optional[str] = Field(
+    style: str = Field(
         default="professional",
         description="Post style: professional, casual, thought-leadership"
     )
@@ -22,24 +24,36 @@ class GeneratePostRequest(BaseModel):
         description="Whether to include relevant hashtags"
     )
     
-    max_length: Optional[int] = Field(
+    max_length: int = Field(
         default=2000,
         ge=100,
         le=3000,
         description="Maximum post length in characters"
     )
     
+    @validator("style")
+    def validate_style(cls, v):
+        """Validate style field."""
+        return validate_style_value(v)
+
+
+class TopicRequest(BaseModel):
+    """Base for requests about one topic."""
+    
+    topic: str = Field(
+        ...,
+        min_length=3,
+        max_length=100,
+        description="Topic to search news for and generate post about"
+    )
+    
     @validator("topic")
     def validate_topic(cls, v):
         """Validate topic field."""
         if not v.strip():
             raise ValueError("Topic cannot be empty")
         return v.strip()
-    
-    @validator("style")
-    def validate_style(cls, v):
-        """Validate style field."""
-        allowed_styles = ["professional", "casual", "thought-leadership"]
-        if v and v not in allowed_styles:
-            raise ValueError(f"Style must be one of: {', '.join(allowed_styles)}")
-        return v
\ No newline at end of file
+
+
+class GeneratePostRequest(TopicRequest, PostOptions):
+    """Request model for generating LinkedIn post."""
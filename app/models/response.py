@@ -11,11 +11,11 @@ class NewsSource(BaseModel):
     published_date: Optional[datetime] = None
     source_name: Optional[str] = None
     snippet: Optional[str] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        }
+    excerpt: Optional[str] = Field(
+        default=None,
+        exclude=True,
+        description="Key sentences from the article text (prompt context only)"
+    )
 
 
 class GeneratePostResponse(BaseModel):
@@ -47,11 +47,6 @@ class GeneratePostResponse(BaseModel):
     word_count: int = Field(description="Word count of generated post")
     
     character_count: int = Field(description="Character count of generated post")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        }
 
 
 class ErrorResponse(BaseModel):
@@ -59,8 +54,3 @@ class ErrorResponse(BaseModel):
     code: str = Field(description="Error code")
     details: dict = Field(default_factory=dict, description="Additional error details")
     timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
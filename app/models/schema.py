@@ -1,10 +1,10 @@
-from typing import List
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, validator
 from app.models.response import NewsSource
+from app.models.requests import GeneratePostRequest, PostOptions, TopicRequest, validate_style_value
 
-class PostRequest(BaseModel):
-    """Request model for post generation."""
-    topic: str = Field(..., min_length=1, max_length=100, description="Topic for LinkedIn post")
+# Request validation is defined once in app.models.requests
+PostRequest = GeneratePostRequest
 
 
 class PostResponse(BaseModel):
@@ -14,4 +14,59 @@ class PostResponse(BaseModel):
         description="List of news sources used for generation"
     )
     linkedin_post: str
-    image_suggestion: str = None
\ No newline at end of file
+    image_suggestion: Optional[str] = None
+    image_thumbnail: Optional[str] = Field(
+        default=None,
+        description="Locally cached thumbnail path, when the image cache is enabled"
+    )
+    session_id: Optional[str] = Field(
+        default=None,
+        description="Session id for regenerating or refining this post without new searches"
+    )
+
+
+class RefineRequest(BaseModel):
+    """Request model for regenerating or refining a post within a session."""
+    instruction: Optional[str] = Field(
+        default=None,
+        max_length=200,
+        description="Revision instruction, e.g. 'shorter' or 'more casual'; omit for a fresh take"
+    )
+    style: Optional[str] = Field(default=None, description="Override the session's post style")
+    max_length: Optional[int] = Field(default=None, ge=100, le=3000, description="Override the maximum length")
+    include_hashtags: Optional[bool] = Field(default=None, description="Override hashtag inclusion")
+
+    @validator("style")
+    def validate_style(cls, v):
+        """Validate style field."""
+        return validate_style_value(v)
+
+
+class VariantsRequest(TopicRequest):
+    """Request model for generating several variants from one news fetch."""
+    variants: List[PostOptions] = Field(
+        ...,
+        min_length=1,
+        max_length=6,
+        description="Style/length combinations to generate"
+    )
+
+
+class VariantResult(BaseModel):
+    """One generated variant."""
+    style: str
+    max_length: int
+    linkedin_post: str
+    hashtags: List[str] = Field(default_factory=list)
+
+
+class VariantsResponse(BaseModel):
+    """Response model for generated variants sharing the same news and image."""
+    topic: str
+    news_sources: List[NewsSource] = Field(
+        description="List of news sources used for generation"
+    )
+    image_suggestion: Optional[str] = None
+    image_thumbnail: Optional[str] = None
+    session_id: Optional[str] = None
+    variants: List[VariantResult]
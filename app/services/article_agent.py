@@ -0,0 +1,211 @@
+import asyncio
+import codecs
+import re
+import time
+from collections import Counter
+from html.parser import HTMLParser
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.logging import get_logger
+from app.models.response import NewsSource
+from app.utils.content_store import ContentStore, content_hash
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'])')
+WORD = re.compile(r"[A-Za-z][A-Za-z'-]{2,}")
+STOPWORDS = frozenset(
+    "the and for that with this from have has had was were are been will would could should "
+    "their there they them than then into about after before over more most said says also "
+    "which while when where what who whom your you our its it's not but can may one two new".split()
+)
+
+
+class ArticleTextParser(HTMLParser):
+    """
+    Streaming extractor for an article's main paragraphs.
+
+    Feed it HTML chunks as they arrive; paragraph text inside <article> is
+    preferred, with all paragraphs outside boilerplate tags as a fallback.
+    """
+
+    SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "figure", "button"}
+    BLOCK_TAGS = {"p", "h2", "h3", "li", "blockquote"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.article_paragraphs: List[str] = []
+        self.paragraphs: List[str] = []
+        self._skip_depth = 0
+        self._article_depth = 0
+        self._block_depth = 0
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "article":
+            self._article_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._block_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "article":
+            self._article_depth = max(self._article_depth - 1, 0)
+        elif tag in self.BLOCK_TAGS and self._block_depth:
+            self._block_depth -= 1
+            if not self._block_depth:
+                self._flush()
+
+    def handle_data(self, data):
+        if self._block_depth and not self._skip_depth:
+            self._buffer.append(data)
+
+    def _flush(self) -> None:
+        text = " ".join("".join(self._buffer).split())
+        self._buffer = []
+        # Very short blocks are bylines, captions and buttons
+        if len(text) >= 40:
+            self.paragraphs.append(text)
+            if self._article_depth:
+                self.article_paragraphs.append(text)
+
+    @property
+    def text_length(self) -> int:
+        return sum(len(paragraph) for paragraph in self.paragraphs)
+
+    def main_text(self) -> str:
+        """Extracted main text."""
+        paragraphs = self.article_paragraphs if len(self.article_paragraphs) >= 3 else self.paragraphs
+        return "\n".join(paragraphs)
+
+
+def condense(text: str, max_sentences: int) -> str:
+    """
+    Condense text to its key sentences, kept in their original order.
+
+    Sentences are scored by the frequency of their content words, with a
+    bonus for numbers since data points make the strongest posts.
+    """
+    sentences = [s.strip() for s in SENTENCE_SPLIT.split(text) if 40 <= len(s.strip()) <= 400]
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    words = [word.lower() for word in WORD.findall(text)]
+    frequencies = Counter(word for word in words if word not in STOPWORDS)
+    if not frequencies:
+        return " ".join(sentences[:max_sentences])
+    top = frequencies.most_common(1)[0][1]
+
+    def score(sentence: str) -> float:
+        tokens = [word.lower() for word in WORD.findall(sentence) if word.lower() not in STOPWORDS]
+        if not tokens:
+            return 0.0
+        value = sum(frequencies[token] / top for token in tokens) / len(tokens) ** 0.5
+        return value * (1.3 if re.search(r"\d", sentence) else 1.0)
+
+    ranked = sorted(range(len(sentences)), key=lambda i: score(sentences[i]), reverse=True)
+    keep = sorted(ranked[:max_sentences])
+    return " ".join(sentences[i] for i in keep)
+
+
+class ArticleAgent:
+    """Fetches top news articles and condenses their text for richer prompts."""
+
+    def __init__(self):
+        self._memory = TTLCache(settings.article_cache_ttl, max_entries=512)
+        self._store: Optional[ContentStore] = None
+        if settings.article_cache_dir:
+            self._store = ContentStore(settings.article_cache_dir, suffix=".json")
+        # Replay runs must not touch the network, so only cached excerpts are used
+        self.offline = settings.provider_mode == "replay"
+
+    async def enrich(self, news_sources: List[NewsSource]) -> List[NewsSource]:
+        """
+        Attach condensed article text to the top news sources.
+
+        Args:
+            news_sources: Sources from the news search
+
+        Returns:
+            Sources with ``excerpt`` set where extraction succeeded
+        """
+        targets = [
+            (index, source) for index, source in enumerate(news_sources)
+            if source.url.startswith(("http://", "https://"))
+        ][:settings.article_fetch_limit]
+        if not targets:
+            return news_sources
+
+        excerpts = await asyncio.gather(*(self.get_excerpt(source.url) for _, source in targets))
+
+        enriched = list(news_sources)
+        for (index, source), excerpt in zip(targets, excerpts):
+            if excerpt:
+                enriched[index] = source.model_copy(update={"excerpt": excerpt})
+        logger.info(f"Enriched {sum(1 for e in excerpts if e)}/{len(targets)} news sources with article text")
+        return enriched
+
+    async def get_excerpt(self, url: str) -> Optional[str]:
+        """Condensed text for an article URL, fetched at most once per cache TTL."""
+        key = content_hash(url)
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached or None
+
+        if self._store is not None:
+            entry = await asyncio.to_thread(self._store.get_json, key)
+            if entry and time.time() - entry.get("fetched_at", 0) < settings.article_cache_ttl:
+                self._memory.set(key, entry["excerpt"])
+                return entry["excerpt"] or None
+
+        if self.offline:
+            return None
+
+        try:
+            text = await asyncio.wait_for(self._fetch_text(url), timeout=settings.article_fetch_timeout)
+        except asyncio.TimeoutError:
+            logger.debug(f"Article fetch timed out for {url}")
+            text = None
+        except Exception as e:
+            # Enrichment is best effort: a bad URL or page must not fail the generation
+            logger.warning(f"Article fetch failed for {url}: {type(e).__name__}: {str(e)}")
+            text = None
+        if text is None:
+            # Remember the failure briefly (memory only) so a bad URL is not refetched on every request
+            self._memory.set(key, "", ttl_seconds=settings.article_failure_ttl)
+            return None
+
+        excerpt = condense(text, settings.article_key_sentences) if text else ""
+        self._memory.set(key, excerpt)
+        if self._store is not None:
+            record = {"url": url, "excerpt": excerpt, "fetched_at": time.time()}
+            try:
+                await asyncio.to_thread(self._store.put_json, key, record)
+            except OSError as e:
+                logger.warning(f"Failed to cache article excerpt for {url}: {str(e)}")
+        return excerpt or None
+
+    async def _fetch_text(self, url: str) -> Optional[str]:
+        """Stream an article and extract its main text, stopping at the size cap; None if unusable."""
+        parser = ArticleTextParser()
+        received = 0
+        async with get_http_client().stream("GET", url, timeout=settings.article_fetch_timeout) as response:
+            if response.status_code != 200:
+                logger.debug(f"Article fetch for {url} returned {response.status_code}")
+                return None
+            if "html" not in response.headers.get("content-type", "html"):
+                return None
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+            async for chunk in response.aiter_bytes():
+                parser.feed(decoder.decode(chunk))
+                received += len(chunk)
+                if received >= settings.article_max_bytes or parser.text_length >= settings.article_max_text:
+                    break
+        parser.close()
+        return parser.main_text()
@@ -1,83 +1,228 @@
 import asyncio
-from typing import Optional
-from serpapi import GoogleSearch
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import quote
+
+import httpx
 
 from app.core.config import settings
+from app.core.executors import get_executor
+from app.core.usage import record_search_call
+from app.core.http import get_http_client
 from app.core.logging import get_logger
+from app.services.providers import SearchProvider, build_search_provider
+from app.utils.content_store import ContentStore, content_hash
 
 logger = get_logger(__name__)
 
+# Magic bytes for the thumbnail formats Google Images returns
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),
+)
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """Detect an image media type from its first bytes."""
+    for signature, media_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return media_type
+    return None
+
 
 class ImageAgent:
     """Service for generating image suggestions using SerpAPI."""
-    
-    def __init__(self):
-        self.serpapi_key = settings.serpapi_api_key
-    
+
+    def __init__(self, search_provider: Optional[SearchProvider] = None):
+        self.search_provider = search_provider if search_provider is not None else build_search_provider()
+        # Replay runs must not touch the network, so candidates are taken as recorded
+        self.offline = settings.provider_mode == "replay"
+
+        # Optional on-disk cache: topic index plus content-addressed thumbnails
+        self.topic_index: Optional[ContentStore] = None
+        self.thumbnails: Optional[ContentStore] = None
+        if settings.image_cache_dir:
+            cache_root = Path(settings.image_cache_dir)
+            self.topic_index = ContentStore(str(cache_root / "topics"), suffix=".json")
+            self.thumbnails = ContentStore(str(cache_root / "thumbs"))
+        self._background: Set[asyncio.Task] = set()
+
     async def get_image_suggestion(self, topic: str) -> Optional[str]:
         """
         Get image suggestion URL for the topic using SerpAPI.
-        
+
         Args:
             topic: The topic to find images for
-            
+
         Returns:
             Image URL or fallback suggestion
         """
         try:
             logger.info(f"Searching images for topic: {topic}")
-            
-            if self.serpapi_key:
+
+            cached = self._get_cached(topic)
+            if cached:
+                logger.info(f"Using cached image for topic: {topic}")
+                return cached["url"]
+
+            if self.search_provider:
                 return await self._search_with_serpapi(topic)
             else:
                 return self._get_fallback_suggestion(topic)
-                
+
         except Exception as e:
             logger.error(f"Image search failed: {str(e)}")
             return self._get_fallback_suggestion(topic)
-    
+
+    def get_thumbnail_url(self, topic: str) -> Optional[str]:
+        """Local URL of the cached thumbnail for a topic, if any."""
+        cached = self._get_cached(topic)
+        if cached and cached.get("thumbnail"):
+            return f"/posts/images/{cached['thumbnail']}"
+        return None
+
+    def get_thumbnail(self, digest: str) -> Optional[bytes]:
+        """Read a cached thumbnail by content digest."""
+        if self.thumbnails is None or len(digest) != 64 or not digest.isalnum():
+            return None
+        return self.thumbnails.get_bytes(digest)
+
     async def _search_with_serpapi(self, topic: str) -> Optional[str]:
-        """Search Google Images using SerpAPI."""
+        """Search Google Images using SerpAPI and return the first reachable candidate."""
         try:
             # Create search query for professional business images
             search_query = f"{topic} professional business"
-            
+
             search_params = {
                 "engine": "google",
                 "q": search_query,
-                "api_key": self.serpapi_key,
                 "tbm": "isch",  # Images search
                 "imgsz": "l",   # Large images
                 "imgtype": "photo",  # Photo type
                 "safe": "active",  # Safe search
-                "num": 3  # Get top 3 results
+                "num": settings.image_candidates
             }
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            search = await loop.run_in_executor(None, lambda: GoogleSearch(search_params))
-            results = await loop.run_in_executor(None, search.get_dict)
-            
-            # Extract image URLs
-            if "images_results" in results and results["images_results"]:
-                # Get the first high-quality image
-                for image in results["images_results"]:
-                    if "original" in image:
-                        logger.info(f"Found image: {image['original']}")
-                        return image["original"]
-                    elif "thumbnail" in image:
-                        logger.info(f"Using thumbnail: {image['thumbnail']}")
-                        return image["thumbnail"] 
-            
-            logger.warning(f"No images found for topic: {topic}")
+
+            # Run in the search pool to avoid blocking; degrade to no results when full
+            results = await get_executor("search").run(
+                lambda: self.search_provider.search(search_params),
+                fallback=dict
+            )
+            if results:
+                # Empty means the executor degraded to the fallback without calling SerpAPI
+                record_search_call()
+
+            candidates = self._select_candidates(results.get("images_results") or [])
+            winner = await self._race_candidates(candidates)
+            if winner:
+                logger.info(f"Found image: {winner['original']}")
+                if self.topic_index is not None and not self.offline:
+                    # Cache off the request path; keep a reference so the task is not collected
+                    task = asyncio.ensure_future(self._cache_result(topic, winner))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return winner["original"]
+
+            logger.warning(f"No reachable images found for topic: {topic}")
             return self._get_fallback_suggestion(topic)
-            
+
         except Exception as e:
             logger.error(f"SerpAPI image search failed: {str(e)}")
             return self._get_fallback_suggestion(topic)
-    
+
+    def _select_candidates(self, images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep results whose reported dimensions suit a LinkedIn post image."""
+        candidates = []
+        for image in images:
+            if not image.get("original"):
+                continue
+            width, height = image.get("original_width"), image.get("original_height")
+            if width and height:
+                if width < settings.image_min_width or not 0.5 <= width / height <= 2.5:
+                    continue
+            candidates.append(image)
+        return candidates[:settings.image_candidates]
+
+    async def _race_candidates(self, candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Validate candidates concurrently and return the first good one within the deadline."""
+        if not candidates:
+            return None
+        if self.offline:
+            return candidates[0]
+
+        async def check(candidate: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            return candidate if await self._is_valid_image(candidate["original"]) else None
+
+        tasks = [asyncio.ensure_future(check(candidate)) for candidate in candidates]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=settings.image_validation_timeout):
+                result = await next_done
+                if result:
+                    return result
+        except asyncio.TimeoutError:
+            logger.warning("Image validation deadline reached")
+        finally:
+            for task in tasks:
+                task.cancel()
+        return None
+
+    async def _is_valid_image(self, url: str) -> bool:
+        """Check an image URL with HEAD, falling back to a one-byte range GET."""
+        client = get_http_client()
+        timeout = settings.image_validation_timeout
+        try:
+            response = await client.head(url, timeout=timeout)
+            if response.status_code in (403, 405, 501):
+                async with client.stream(
+                    "GET", url, headers={"Range": "bytes=0-0"}, timeout=timeout
+                ) as streamed:
+                    response = streamed
+
+            if response.status_code not in (200, 206):
+                return False
+            if not response.headers.get("content-type", "").startswith("image/"):
+                return False
+
+            # Content-Range carries the full size for range responses
+            size = response.headers.get("content-range", "").rpartition("/")[2] or response.headers.get("content-length")
+            if size and size.isdigit() and int(size) > 0 and not 1024 <= int(size) <= settings.image_max_bytes:
+                return False
+            return True
+        except (httpx.HTTPError, ValueError) as e:
+            logger.debug(f"Image candidate rejected {url}: {str(e)}")
+            return False
+
+    def _get_cached(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Cached image entry for a topic, if fresh."""
+        if self.topic_index is None:
+            return None
+        entry = self.topic_index.get_json(content_hash(topic.strip().lower()))
+        if entry and time.time() - entry.get("cached_at", 0) < settings.image_cache_ttl:
+            return entry
+        return None
+
+    async def _cache_result(self, topic: str, image: Dict[str, Any]) -> None:
+        """Store the chosen image URL and a small thumbnail for repeat topics."""
+        digest = None
+        thumbnail_url = image.get("thumbnail")
+        if thumbnail_url:
+            try:
+                response = await get_http_client().get(thumbnail_url, timeout=settings.image_validation_timeout)
+                data = response.content
+                if response.status_code == 200 and len(data) <= settings.image_thumbnail_max_bytes and sniff_image_type(data):
+                    digest = self.thumbnails.put_bytes(data)
+            except httpx.HTTPError as e:
+                logger.debug(f"Thumbnail download failed: {str(e)}")
+
+        self.topic_index.put_json(
+            content_hash(topic.strip().lower()),
+            {"url": image["original"], "thumbnail": digest, "cached_at": time.time()}
+        )
+
     def _get_fallback_suggestion(self, topic: str) -> str:
-        """Fallback image suggestion when SerpAPI is unavailable."""
-        topic_encoded = topic.replace(" ", "%20")
+        """Fallback image suggestion (Unsplash search page) when no image was found."""
         logger.info(f"Using fallback image suggestion for: {topic}")
-        return f"https://source.unsplash.com/1200x630/?{topic_encoded},business,professional"
\ No newline at end of file
+        return f"https://unsplash.com/s/photos/{quote(topic)}"
@@ -1,39 +1,132 @@
 import asyncio
-from typing import List, Dict, Any, Optional
-from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
+import math
+import re
+import time
+from typing import Callable, List, Dict, Any, Optional
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
 from langchain.prompts import PromptTemplate
 
 from app.core.config import settings
-from app.core.exceptions import AIGenerationError, APIKeyError
+from app.core.executors import get_executor
+from app.core.exceptions import AIGenerationError, APIKeyError, ExecutorSaturatedError
 from app.core.logging import get_logger
+from app.core.usage import record_llm_call
 from app.models.response import NewsSource
+from app.services.providers import LLMProvider, LLMResult, build_llm_provider
+from app.services.model_router import ModelRouter
 
 logger = get_logger(__name__)
 
+# Sentence end: punctuation, optional closing quote/bracket, then whitespace or end
+SENTENCE_END = re.compile(r'[.!?]["\')\]]?(?=\s|$)')
+
+# Hashtag lines (and blank lines) at the start of a post
+LEADING_HASHTAGS = re.compile(r'(?:[ \t]*(?:#\w[^\n]*)?\n)*(?=[ \t]*[^#\s])')
+
+# Output tokens reserved for a trailing hashtag line / the hashtag-only prompt
+HASHTAG_TOKEN_ALLOWANCE = 48
+HASHTAG_MAX_TOKENS = 64
+
 
 class AIAgent:
     """AI Agent for generating LinkedIn posts using Google Gemini."""
     
-    def __init__(self):
+    def __init__(self, llm_provider: Optional[LLMProvider] = None):
         try:
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                google_api_key=settings.google_api_key,
-                temperature=settings.temperature
-            )
+            self.llm_provider = llm_provider or build_llm_provider()
+            self.router = ModelRouter.from_settings()
             logger.info("AI Agent initialized successfully")
+        except APIKeyError:
+            raise
         except Exception as e:
             logger.error(f"Failed to initialize AI Agent: {str(e)}")
             raise APIKeyError(f"Failed to initialize Gemini API: {str(e)}")
     
+    async def _invoke(
+        self,
+        messages: List[BaseMessage],
+        task: str,
+        max_output_tokens: Optional[int] = None,
+        should_stop: Optional[Callable[[str], bool]] = None
+    ) -> LLMResult:
+        """
+        Run one model call on the LLM executor, failing over between routed models.
+        
+        Args:
+            messages: Prompt messages
+            task: Routing task (hashtags, short_post, long_post)
+            max_output_tokens: Output token limit for the call
+            should_stop: If given, stream and stop once it returns True
+            
+        Returns:
+            Result from the first model that succeeds
+        """
+        last_error: Optional[Exception] = None
+        for route in self.router.candidates(task):
+            started = time.perf_counter()
+            try:
+                if should_stop is not None:
+                    call = lambda: self.llm_provider.stream(
+                        messages, route.model, route.temperature, max_output_tokens, should_stop
+                    )
+                else:
+                    call = lambda: self.llm_provider.invoke(
+                        messages, route.model, route.temperature, max_output_tokens
+                    )
+                result = await get_executor("llm").run(call)
+                self.router.record(route.model, result.latency or time.perf_counter() - started, True)
+                record_llm_call(task, route.model, result.usage)
+                return result
+            except ExecutorSaturatedError:
+                raise
+            except Exception as e:
+                self.router.record(route.model, time.perf_counter() - started, False)
+                logger.warning(f"Model {route.model} failed for {task}: {str(e)}")
+                last_error = e
+        raise last_error
+    
+    async def warm_up(self, timeout: float) -> bool:
+        """
+        Make one cheap call per model so the Gemini transports are connected before traffic.
+        
+        Each probe is a billed call, so by default only the post client of each
+        model is warmed; STARTUP_PROBE_ALL_ROUTES warms every routed client.
+        
+        Args:
+            timeout: Maximum seconds to wait for the probe
+            
+        Returns:
+            True if the probe succeeded
+        """
+        routes = self.router.routes()
+        if not settings.startup_probe_all_routes:
+            first_per_model = {}
+            for route in routes:
+                first_per_model.setdefault(route.model, route)
+            routes = list(first_per_model.values())
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(
+                    get_executor("llm").run(self.llm_provider.ping, route.model, route.temperature)
+                    for route in routes
+                )),
+                timeout=timeout
+            )
+            logger.info("Gemini warm-up probe succeeded")
+            return True
+        except Exception as e:
+            logger.warning(f"Gemini warm-up probe failed: {str(e)}")
+            return False
+    
     async def generate_linkedin_post(
         self,
         topic: str,
         news_sources: List[NewsSource],
         style: str = "professional",
         max_length: int = 2000,
-        include_hashtags: bool = True
+        include_hashtags: bool = True,
+        previous_post: Optional[str] = None,
+        refinement: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate a LinkedIn post based on news sources.
@@ -42,6 +135,8 @@ class AIAgent:
             topic: The main topic
             news_sources: List of news sources
             include_hashtags: Whether to include hashtags
+            previous_post: Earlier draft to revise (used with refinement)
+            refinement: Revision instruction, e.g. "shorter" or "more casual"
             
         Returns:
             Dictionary containing post content, hashtags
@@ -49,27 +144,36 @@ class AIAgent:
         try:
             logger.info(f"Generating LinkedIn post for topic: {topic}")
             
+            # A streamed post may be stopped early, so ask for its hashtags first where the stop cannot cut them
+            stream = settings.llm_stream_posts
+            
             # Create prompt for post generation
             post_prompt = self._create_post_prompt(
-                topic, news_sources, style, max_length, include_hashtags
+                topic, news_sources, style, max_length, include_hashtags,
+                previous_post, refinement, hashtags_first=stream
             )
             
             messages = HumanMessage(content = post_prompt) 
 
-            # Generate post content
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, lambda: self.llm.invoke([messages])
+            # Generate post content, capped to the character budget
+            response = await self._invoke(
+                [messages],
+                self.router.post_task(style, max_length),
+                max_output_tokens=self._max_output_tokens(max_length, include_hashtags),
+                should_stop=self._stop_after_limit(max_length) if stream else None
             )
             
             post_content = response.content.strip()
             
-            # Extract hashtags and image suggestion
-            hashtags = await self._extract_hashtags(post_content, topic)
+            # Extract hashtags (skip the fallback hashtag call when none were requested, and
+            # never follow an early-stopped stream with a second sequential model call)
+            hashtags = await self._extract_hashtags(
+                post_content, topic, allow_generation=not response.stopped
+            ) if include_hashtags else []
             
             
             # Clean up the post content (remove hashtags section if present)
-            clean_post = self._clean_post_content(post_content)
+            clean_post = self._trim_to_length(self._clean_post_content(post_content), max_length)
             
             result = {
                 "post_content": clean_post,
@@ -81,6 +185,8 @@ class AIAgent:
             logger.info("LinkedIn post generated successfully")
             return result
             
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Failed to generate LinkedIn post: {str(e)}")
             raise AIGenerationError(f"Failed to generate post: {str(e)}")
@@ -91,7 +197,10 @@ class AIAgent:
         news_sources: List[NewsSource],
         style: str,
         max_length: int,
-        include_hashtags: bool
+        include_hashtags: bool,
+        previous_post: Optional[str] = None,
+        refinement: Optional[str] = None,
+        hashtags_first: bool = False
     ) -> str:
         """Create prompt for LinkedIn post generation."""
         
@@ -101,6 +210,8 @@ class AIAgent:
             news_text += f"\n{i}. {source.title}\n"
             if source.snippet:
                 news_text += f"   Summary: {source.snippet}\n"
+            if source.excerpt:
+                news_text += f"   Key points: {source.excerpt}\n"
             news_text += f"   Source: {source.source_name or 'Unknown'}\n"
         
         # Style-specific instructions
@@ -110,11 +221,29 @@ class AIAgent:
             "thought-leadership": "Position the content as expert analysis. Share strategic insights and future implications."
         }
         
+        # Revision of an earlier draft, when refining a session
+        revision_text = ""
+        if refinement and previous_post:
+            revision_text = f"""
+        PREVIOUS DRAFT:
+        {previous_post}
+
+        REVISION REQUEST: {refinement}
+        Rewrite the previous draft to satisfy the revision request while meeting the requirements below.
+        """
+        
+        if not include_hashtags:
+            hashtag_text = "Do not include hashtags"
+        elif hashtags_first:
+            hashtag_text = "Put 3-5 relevant hashtags on the first line, then a blank line, then the post"
+        else:
+            hashtag_text = "Include 3-5 relevant hashtags at the end"
+        
         prompt_text = f"""
         You are a professional LinkedIn content creator. Create an engaging LinkedIn post about "{topic}" based on the following recent news:
 
         {news_text}
-
+        {revision_text}
         REQUIREMENTS:
         - Style: {style_instructions.get(style, style_instructions['professional'])}
         - Maximum length: {max_length} characters
@@ -122,7 +251,7 @@ class AIAgent:
         - Include a compelling hook in the first line
         - Structure with proper paragraphs and line breaks
         - End with a thought-provoking question or call to action
-        - {'Include 3-5 relevant hashtags at the end' if include_hashtags else 'Do not include hashtags'}
+        - {hashtag_text}
         
         CONTENT GUIDELINES:
         - Start with an attention-grabbing opening
@@ -137,8 +266,8 @@ class AIAgent:
         
         return prompt_text
     
-    async def _extract_hashtags(self, post_content: str, topic: str) -> List[str]:
-        """Extract or generate relevant hashtags."""
+    async def _extract_hashtags(self, post_content: str, topic: str, allow_generation: bool = True) -> List[str]:
+        """Extract or generate relevant hashtags (generation needs a model call; otherwise topic tags are used)."""
         try:
             # First, try to extract hashtags from the generated content
             lines = post_content.split('\n')
@@ -149,6 +278,9 @@ class AIAgent:
                     tags = [tag.strip() for tag in line.split() if tag.startswith('#')]
                     hashtags.extend(tags)
             
+            if not hashtags and not allow_generation:
+                return self._topic_hashtags(topic)
+            
             # If no hashtags found, generate some
             if not hashtags:
                 hashtag_prompt = SystemMessage(content=f"""
@@ -157,9 +289,10 @@ class AIAgent:
                 Focus on professional, industry-relevant tags.
                 """)
                 
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None, lambda: self.llm.invoke([hashtag_prompt])
+                response = await self._invoke(
+                    [hashtag_prompt],
+                    "hashtags",
+                    max_output_tokens=HASHTAG_MAX_TOKENS + (settings.llm_thinking_budget or 0)
                 )
                 
                 hashtag_lines = response.content.strip().split('\n')
@@ -169,14 +302,49 @@ class AIAgent:
             
         except Exception as e:
             logger.warning(f"Failed to extract hashtags: {str(e)}")
-            # Return some generic hashtags based on topic
-            return [f"#{topic.replace(' ', '')}", "#LinkedIn", "#Industry", "#Business"]
+            return self._topic_hashtags(topic)
+    
+    def _topic_hashtags(self, topic: str) -> List[str]:
+        """Generic hashtags based on the topic."""
+        return [f"#{topic.replace(' ', '')}", "#LinkedIn", "#Industry", "#Business"]
+    
+    
     
+    def _max_output_tokens(self, max_length: int, include_hashtags: bool) -> int:
+        """Map a character budget to a max-output-token limit."""
+        tokens = math.ceil(max_length / settings.llm_chars_per_token * settings.llm_output_token_margin)
+        if include_hashtags:
+            tokens += HASHTAG_TOKEN_ALLOWANCE
+        return tokens + (settings.llm_thinking_budget or 0)
+    
+    def _stop_after_limit(self, max_length: int) -> Callable[[str], bool]:
+        """Stop predicate: first sentence boundary past the character limit, not counting leading hashtags."""
+        def should_stop(text: str) -> bool:
+            start = self._body_start(text)
+            return len(text) - start > max_length and SENTENCE_END.search(text, start + max_length) is not None
+        return should_stop
+    
+    def _trim_to_length(self, content: str, max_length: int) -> str:
+        """Trim a post to max_length, preferring a sentence boundary."""
+        if len(content) <= max_length:
+            return content
+        
+        cut = content[:max_length]
+        sentence_ends = [match.end() for match in SENTENCE_END.finditer(cut)]
+        if sentence_ends and sentence_ends[-1] >= max_length // 2:
+            return cut[:sentence_ends[-1]].rstrip()
+        
+        # No usable sentence end; drop the partial last word
+        return cut.rsplit(None, 1)[0].rstrip()
     
+    def _body_start(self, text: str) -> int:
+        """Offset where the post starts, after any leading hashtag lines."""
+        match = LEADING_HASHTAGS.match(text)
+        return match.end() if match else 0
     
     def _clean_post_content(self, content: str) -> str:
         """Clean up the generated post content."""
-        lines = content.split('\n')
+        lines = content[self._body_start(content):].split('\n')
         cleaned_lines = []
         
         for line in lines:
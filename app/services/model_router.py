@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Model configuration chosen for one call."""
+    model: str
+    temperature: float
+
+
+class ModelStats:
+    """
+    Rolling latency and error statistics for one model.
+
+    Samples expire after max_age seconds. A degraded model is sorted last and
+    gets little traffic, so without expiry its bad samples would keep it
+    degraded forever; once they age out it is tried again.
+    """
+
+    def __init__(self, window: int, max_age: float):
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), latency, ok))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Sample count, error rate and latency percentiles over the window."""
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            samples = [(latency, ok) for _, latency, ok in self._samples]
+        if not samples:
+            return {"samples": 0, "error_rate": 0.0, "p50_latency": 0.0, "p95_latency": 0.0}
+        latencies = sorted(latency for latency, ok in samples if ok) or [0.0]
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "samples": len(samples),
+            "error_rate": round(errors / len(samples), 3),
+            "p50_latency": round(latencies[len(latencies) // 2], 3),
+            "p95_latency": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3)
+        }
+
+
+class ModelRouter:
+    """
+    Pick an ordered list of models per task.
+
+    Hashtags and short posts prefer the light model, long or thought-leadership
+    posts the primary one. A model whose rolling error rate or p95 latency is
+    over budget drops behind healthy alternatives; callers fail over down the list.
+    Statistics only cover the last ``max_age`` seconds, so traffic fails back
+    once a demoted model's bad samples expire.
+    """
+
+    def __init__(
+        self,
+        primary_model: str,
+        light_model: str,
+        short_post_chars: int,
+        window: int,
+        max_age: float,
+        min_samples: int,
+        max_error_rate: float,
+        latency_budget: float
+    ):
+        self.primary_model = primary_model
+        self.light_model = light_model
+        self.short_post_chars = short_post_chars
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.latency_budget = latency_budget
+        self._stats = {
+            model: ModelStats(window, max_age) for model in dict.fromkeys([primary_model, light_model])
+        }
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        return cls(
+            primary_model=settings.llm_model,
+            light_model=settings.llm_light_model,
+            short_post_chars=settings.llm_short_post_chars,
+            window=settings.llm_stats_window,
+            max_age=settings.llm_stats_max_age,
+            min_samples=settings.llm_min_samples,
+            max_error_rate=settings.llm_max_error_rate,
+            latency_budget=settings.llm_latency_budget
+        )
+
+    @property
+    def models(self) -> List[str]:
+        return list(self._stats)
+
+    def post_task(self, style: str, max_length: int) -> str:
+        """Task name for a post with the given style and length."""
+        if style == "thought-leadership" or max_length > self.short_post_chars:
+            return "long_post"
+        return "short_post"
+
+    def candidates(self, task: str) -> List[ModelRoute]:
+        """Models to try for a task, best first."""
+        if task == "hashtags":
+            preferred = [self.light_model, self.primary_model]
+            temperature = settings.llm_hashtag_temperature
+        elif task == "short_post":
+            preferred = [self.light_model, self.primary_model]
+            temperature = settings.temperature
+        else:
+            preferred = [self.primary_model, self.light_model]
+            temperature = settings.temperature
+
+        # Deduplicate (light and primary may be the same model), healthy models first
+        ordered = list(dict.fromkeys(preferred))
+        ordered.sort(key=self.is_degraded)
+        return [ModelRoute(model, temperature) for model in ordered]
+
+    def routes(self) -> List[ModelRoute]:
+        """Every distinct model configuration any task can use, post routes first."""
+        tasks = ("short_post", "long_post", "hashtags")
+        return list(dict.fromkeys(route for task in tasks for route in self.candidates(task)))
+
+    def is_degraded(self, model: str) -> bool:
+        """Whether a model's recent error rate or latency is over budget."""
+        snapshot = self._stats[model].snapshot()
+        if snapshot["samples"] < self.min_samples:
+            return False
+        return (
+            snapshot["error_rate"] > self.max_error_rate
+            or snapshot["p95_latency"] > self.latency_budget
+        )
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        """Record the outcome of a call."""
+        stats = self._stats.get(model)
+        if stats is not None:
+            stats.record(latency, ok)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            model: {**stats.snapshot(), "degraded": self.is_degraded(model)}
+            for model, stats in self._stats.items()
+        }
@@ -1,19 +1,40 @@
-import asyncio
+import re
 from typing import List, Optional
-from datetime import datetime, timedelta
-from serpapi import GoogleSearch
+from datetime import datetime, timedelta, timezone
 
 from app.core.config import settings
+from app.core.executors import get_executor
+from app.core.usage import record_search_call
 from app.core.logging import get_logger
 from app.models.response import NewsSource
-from app.core.exceptions import NewsSearchError
+from app.core.exceptions import ExecutorSaturatedError, NewsSearchError
+from app.services.providers import SearchProvider, build_search_provider
+from app.services.news_store import NewsArticleStore
 
 logger = get_logger(__name__)
 
+# SerpAPI relative dates, e.g. "3 hours ago", "1 day ago", "2 weeks ago"
+RELATIVE_DATE = re.compile(r"^(\d+|an?)\s+(minute|min|hour|day|week|month|year)s?\s+ago$", re.IGNORECASE)
+RELATIVE_UNITS = {
+    "minute": timedelta(minutes=1),
+    "min": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365)
+}
+ABSOLUTE_DATE_FORMATS = [
+    "%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%SZ",
+    "%m/%d/%Y, %I:%M %p, %z UTC",  # SerpAPI Google News: "10/19/2026, 07:00 AM, +0000 UTC"
+    "%b %d, %Y", "%B %d, %Y", "%d %b %Y"
+]
+
 class NewsSearchAgent:
     """Agent to handle news searching using Google Custom Search or SerpAPI."""
-    def __init__(self):
-        self.serp_api_key = settings.serpapi_api_key
+    def __init__(self, search_provider: Optional[SearchProvider] = None):
+        self.search_provider = search_provider if search_provider is not None else build_search_provider()
+        self.store = NewsArticleStore(settings.news_search_days, settings.news_store_max_topics)
 
     async def search_news(self, topic: str, limit: int = 5) -> List[NewsSource]:
         """
@@ -33,70 +54,74 @@ class NewsSearchAgent:
         try:
             logger.info(f"Searching news for topic: {topic}")
             
-            if self.serp_api_key:
+            if self.search_provider:
                 return await self._search_with_serpapi(topic, limit)
             else:
-                # Fallback to a simple web scraping approach
-                return await self._get_fallback_urls(topic, limit)
+                # No search backend; the caller falls back to a generic source
+                logger.warning("No search provider configured, skipping news search")
+                return []
                 
+        except ExecutorSaturatedError:
+            # Capacity, not a search failure: surfaces as 503 with Retry-After
+            raise
         except Exception as e:
             logger.error(f"News search failed: {str(e)}")
             raise NewsSearchError(f"Failed to search news: {str(e)}")
         
-    async def _search_with_serpapi(self, topic: str, limit: int) -> List[str]:
-        """Search using SerpAPI."""
+    async def _search_with_serpapi(self, topic: str, limit: int) -> List[NewsSource]:
+        """Search using SerpAPI, fetching only articles newer than the last fetch for the topic."""
         try:
-            # Calculate date range for recent news
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=settings.news_search_days)
+            now = datetime.utcnow()
+            cached = self.store.get(topic)
+            if cached and (now - cached.last_fetched).total_seconds() < settings.news_refresh_interval:
+                logger.info(f"Using cached news for topic: {topic}")
+                return self.store.recent(topic, limit)
             
             search_params = {
                 "engine": "google",
                 "q": f"{topic} news",
-                "api_key": self.serp_api_key,
                 "num": limit,
                 "tbm": "nws",  # News search
-                "tbs": f"cdr:1,cd_min:{start_date.strftime('%m/%d/%Y')},cd_max:{end_date.strftime('%m/%d/%Y')}"
+                "tbs": self._time_filter(cached.last_fetched if cached else None, now)
             }
             
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            search = await loop.run_in_executor(
-                None, lambda: GoogleSearch(search_params)
+            # Run in the search pool to avoid blocking; degrade to no results when full
+            results = await get_executor("search").run(
+                lambda: self.search_provider.search(search_params),
+                fallback=dict
             )
-            results = await loop.run_in_executor(None, search.get_dict)
+            if results:
+                # Empty means the executor degraded to the fallback without calling SerpAPI
+                record_search_call()
+            
+            if "news_results" not in results:
+                # Degraded executor or SerpAPI error payload: nothing was fetched, so keep
+                # last_fetched where it is and let the next call query the same window again
+                logger.warning(f"No news results for topic: {topic} ({results.get('error', 'search degraded')})")
+                return self.store.recent(topic, limit)
             
             news_sources = []
-
+            for result in results["news_results"][:limit]:
+                # Explicitly create NewsSource objects
+                source = NewsSource(
+                    title=str(result.get("title", "")),
+                    url=str(result.get("link", "")),
+                    source_name=str(result.get("source", "")),
+                    snippet=str(result.get("snippet", "")),
+                    published_date=self._parse_date(result.get("iso_date") or result.get("date"))
+                )
+                news_sources.append(source)
             
-            if "news_results" in results:
-                for result in results["news_results"][:limit]:
-                    # Explicitly create NewsSource objects
-                    source = NewsSource(
-                        title=str(result.get("title", "")),
-                        url=str(result.get("link", "")),
-                        source_name=str(result.get("source", "")),
-                        snippet=str(result.get("snippet", "")),
-                        published_date=self._parse_date(result.get("date"))
-                    )
-                    news_sources.append(source)
-            
-            logger.info(f"Found {len(news_sources)} news articles")
-            return news_sources if news_sources else self._get_fallback_urls(topic)
+            logger.info(f"Found {len(news_sources)} new news articles")
+            self.store.merge(topic, news_sources, now)
+            return self.store.recent(topic, limit)
             
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"SerpAPI search failed: {str(e)}")
             raise NewsSearchError(f"SerpAPI search failed: {str(e)}")
         
-    def _get_fallback_urls(self, topic: str) -> List[str]:
-        """Return fallback URLs if no news found."""
-        logger.info("Using fallback news URLs")
-        return [
-            f"https://news.google.com/search?q={topic.replace(' ', '%20')}",
-            f"https://www.bing.com/news/search?q={topic.replace(' ', '%20')}",
-            f"https://www.reuters.com/search/news?blob={topic.replace(' ', '%20')}"
-        ]
-    
     # async def _search_fallback(self, topic: str, limit: int) -> List[NewsSource]:
     #     """Fallback search method using NewsAPI or similar free service."""
     #     logger.warning("Using fallback news search method")
@@ -150,18 +175,53 @@ class NewsSearchAgent:
         
     #     return news_sources
     
+    def _time_filter(self, since: Optional[datetime], now: datetime) -> str:
+        """
+        Google `tbs` filter covering the time since the last fetch.
+        
+        Uses the narrowest relative range (past hour/day/week) that covers the
+        gap, or the full configured window when the topic has not been fetched.
+        """
+        window = timedelta(days=settings.news_search_days)
+        if since is not None:
+            gap = now - since
+            if gap <= timedelta(hours=1):
+                return "qdr:h"
+            if gap <= timedelta(days=1):
+                return "qdr:d"
+            if gap <= timedelta(weeks=1) and gap < window:
+                return "qdr:w"
+            if gap < window:
+                return f"cdr:1,cd_min:{since.strftime('%m/%d/%Y')},cd_max:{now.strftime('%m/%d/%Y')}"
+        
+        start_date = now - window
+        return f"cdr:1,cd_min:{start_date.strftime('%m/%d/%Y')},cd_max:{now.strftime('%m/%d/%Y')}"
+    
     def _parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
-        """Parse date string to datetime object."""
+        """Parse date string (absolute or SerpAPI relative) to a naive UTC datetime."""
         if not date_str:
             return None
             
         try:
+            date_str = date_str.strip()
+            
+            # Relative dates: "3 hours ago", "a day ago", "yesterday"
+            if date_str.lower() == "yesterday":
+                return datetime.utcnow() - timedelta(days=1)
+            match = RELATIVE_DATE.match(date_str)
+            if match:
+                amount = 1 if match.group(1).lower() in ("a", "an") else int(match.group(1))
+                return datetime.utcnow() - amount * RELATIVE_UNITS[match.group(2).lower()]
+            
             # Handle various date formats
-            for fmt in ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%SZ"]:
+            for fmt in ABSOLUTE_DATE_FORMATS:
                 try:
-                    return datetime.strptime(date_str, fmt)
+                    parsed = datetime.strptime(date_str, fmt)
                 except ValueError:
                     continue
+                if parsed.tzinfo is not None:
+                    parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+                return parsed
                     
             # If no format matches, return None
             return None
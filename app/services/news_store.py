@@ -0,0 +1,81 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.models.response import NewsSource
+from app.utils.ttl_cache import TTLCache
+
+
+@dataclass
+class StoredArticle:
+    """A news article with the time it was first seen."""
+    source: NewsSource
+    first_seen: datetime
+
+    @property
+    def recency(self) -> datetime:
+        """Best known time for the article: published date, else first seen."""
+        return self.source.published_date or self.first_seen
+
+
+@dataclass
+class TopicNews:
+    """Articles known for a topic and when they were last fetched."""
+    last_fetched: datetime
+    articles: Dict[str, StoredArticle] = field(default_factory=dict)
+
+
+class NewsArticleStore:
+    """
+    Per-process store of recent articles per topic.
+
+    Lets the news agent query only the time since its last fetch and merge
+    the results, instead of re-querying the whole search window.
+    """
+
+    def __init__(self, window_days: int, max_topics: int):
+        self.window = timedelta(days=window_days)
+        self._topics = TTLCache(self.window.total_seconds(), max_topics)
+
+    @staticmethod
+    def _key(topic: str) -> str:
+        return " ".join(topic.lower().split())
+
+    def get(self, topic: str) -> Optional[TopicNews]:
+        return self._topics.get(self._key(topic))
+
+    def merge(self, topic: str, sources: List[NewsSource], fetched_at: datetime) -> TopicNews:
+        """
+        Merge newly fetched articles, deduplicating by URL and ageing out old ones.
+
+        Args:
+            topic: Topic the articles were fetched for
+            sources: Newly fetched articles
+            fetched_at: When the fetch ran (naive UTC)
+
+        Returns:
+            Updated topic entry
+        """
+        entry = self.get(topic) or TopicNews(last_fetched=fetched_at)
+        for source in sources:
+            if not source.url:
+                continue
+            existing = entry.articles.get(source.url)
+            entry.articles[source.url] = StoredArticle(
+                source=source,
+                first_seen=existing.first_seen if existing else fetched_at
+            )
+
+        cutoff = fetched_at - self.window
+        entry.articles = {url: article for url, article in entry.articles.items() if article.recency >= cutoff}
+        entry.last_fetched = fetched_at
+        self._topics.set(self._key(topic), entry)
+        return entry
+
+    def recent(self, topic: str, limit: int) -> List[NewsSource]:
+        """Most recent articles for a topic."""
+        entry = self.get(topic)
+        if entry is None:
+            return []
+        articles = sorted(entry.articles.values(), key=lambda article: article.recency, reverse=True)
+        return [article.source for article in articles[:limit]]
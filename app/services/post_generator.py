@@ -1,11 +1,18 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 from app.services.linkedin_agent import AIAgent
 from app.services.news_agent import NewsSearchAgent
 from app.services.image_agent import ImageAgent
+from app.services.article_agent import ArticleAgent
+from app.services.providers import build_llm_provider, build_search_provider
+from app.services.session_store import SessionStore
 from app.models.response import NewsSource
+from app.core.config import settings
 from app.core.logging import get_logger
-from app.core.exceptions import AppException
-from app.models.schema import PostRequest, PostResponse
+from app.core.exceptions import AppException, SessionNotFoundError
+from app.models.schema import (
+    PostRequest, PostResponse, RefineRequest, VariantsRequest, VariantsResponse, VariantResult
+)
 
 logger = get_logger(__name__)
 
@@ -14,9 +21,20 @@ class PostGeneratorService:
     """Main service for orchestrating post generation."""
     
     def __init__(self):
-        self.ai_agent = AIAgent()
-        self.news_service = NewsSearchAgent()
-        self.image_service  = ImageAgent()
+        search_provider = build_search_provider()
+        self.ai_agent = AIAgent(build_llm_provider())
+        self.news_service = NewsSearchAgent(search_provider)
+        self.image_service  = ImageAgent(search_provider)
+        self.article_service = ArticleAgent()
+        self.sessions = SessionStore(
+            settings.session_ttl_seconds,
+            settings.session_max_entries,
+            store_dir=settings.state_dir
+        )
+    
+    async def warm_up(self, timeout: float) -> bool:
+        """Probe upstream dependencies once so the first request is not cold."""
+        return await self.ai_agent.warm_up(timeout)
     
     async def generate_post(self, request: PostRequest) -> PostResponse:
         """
@@ -34,35 +52,30 @@ class PostGeneratorService:
         try:
             logger.info(f"Starting post generation for topic: {request.topic}")
             
-            # Step 1: Search for recent news
-            news_sources = await self.news_service.search_news(
-                topic=request.topic,
-                limit=5
-            )
-            
-            if not news_sources:
-                logger.warning(f"No news sources found for topic: {request.topic}")
-                # Create a fallback news source
-                news_sources = [
-                    NewsSource(
-                        title=f"Industry insights on {request.topic}",
-                        url=f"https://example.com/{request.topic.lower().replace(' ', '-')}",
-                        source_name="Industry Report",
-                        snippet=f"Latest trends and developments in {request.topic}"
-                    )
-                ]
+            # Step 1: Search for recent news and an image in parallel
+            news_sources, image_suggestion = await self._gather_context(request.topic)
             
             # Step 2: Generate LinkedIn post using AI
             generation_result = await self.ai_agent.generate_linkedin_post(
                 topic=request.topic,
                 news_sources=news_sources,
-                style= "professional",
-                max_length= 2000,
-                include_hashtags= True
+                style=request.style,
+                max_length=request.max_length,
+                include_hashtags=request.include_hashtags
+            )
+            
+            # Step 3: Keep the context so regenerate/refine can skip the searches
+            image_thumbnail = self.image_service.get_thumbnail_url(request.topic)
+            session = await self.sessions.create(
+                topic=request.topic,
+                news_sources=news_sources,
+                image_suggestion=image_suggestion,
+                image_thumbnail=image_thumbnail,
+                style=request.style,
+                max_length=request.max_length,
+                include_hashtags=request.include_hashtags,
+                last_post=generation_result["post_content"]
             )
-
-            # Step 3: Get image suggestion
-            image_suggestion = await self.image_service.get_image_suggestion(request.topic)
             
             # Step 4: Create response
             response = PostResponse(
@@ -70,7 +83,8 @@ class PostGeneratorService:
                 linkedin_post=generation_result["post_content"],
                 news_sources=news_sources,
                 image_suggestion=image_suggestion,
-                
+                image_thumbnail=image_thumbnail,
+                session_id=session.session_id
             )
             
             logger.info("Post generation completed successfully")
@@ -81,4 +95,172 @@ class PostGeneratorService:
             if isinstance(e, AppException):
                 raise
             else:
-                raise AppException(f"Unexpected error during post generation: {str(e)}")
\ No newline at end of file
+                raise AppException(f"Unexpected error during post generation: {str(e)}")
+    
+    async def generate_variants(self, request: VariantsRequest) -> VariantsResponse:
+        """
+        Generate several style/length variants from a single news and image lookup.
+        
+        Args:
+            request: Variants request
+            
+        Returns:
+            Variants response sharing news sources and image suggestion
+            
+        Raises:
+            AppException: If generation fails
+        """
+        try:
+            logger.info(
+                f"Starting generation of {len(request.variants)} variants for topic: {request.topic}"
+            )
+            
+            news_sources, image_suggestion = await self._gather_context(request.topic)
+            
+            # LLM calls are independent once the context is shared
+            results = await asyncio.gather(*(
+                self.ai_agent.generate_linkedin_post(
+                    topic=request.topic,
+                    news_sources=news_sources,
+                    style=variant.style,
+                    max_length=variant.max_length,
+                    include_hashtags=variant.include_hashtags
+                )
+                for variant in request.variants
+            ))
+            
+            first_variant = request.variants[0]
+            image_thumbnail = self.image_service.get_thumbnail_url(request.topic)
+            session = await self.sessions.create(
+                topic=request.topic,
+                news_sources=news_sources,
+                image_suggestion=image_suggestion,
+                image_thumbnail=image_thumbnail,
+                style=first_variant.style,
+                max_length=first_variant.max_length,
+                include_hashtags=first_variant.include_hashtags,
+                last_post=results[0]["post_content"]
+            )
+            
+            response = VariantsResponse(
+                topic=request.topic,
+                news_sources=news_sources,
+                image_suggestion=image_suggestion,
+                image_thumbnail=image_thumbnail,
+                session_id=session.session_id,
+                variants=[
+                    VariantResult(
+                        style=variant.style,
+                        max_length=variant.max_length,
+                        linkedin_post=result["post_content"],
+                        hashtags=result["hashtags"] if variant.include_hashtags else []
+                    )
+                    for variant, result in zip(request.variants, results)
+                ]
+            )
+            
+            logger.info("Variant generation completed successfully")
+            return response
+            
+        except Exception as e:
+            logger.error(f"Variant generation failed: {str(e)}")
+            if isinstance(e, AppException):
+                raise
+            else:
+                raise AppException(f"Unexpected error during variant generation: {str(e)}")
+    
+    async def regenerate(self, session_id: str, request: RefineRequest) -> PostResponse:
+        """
+        Regenerate or refine a post from a session's stored news and image context.
+        
+        Only the AI step runs; news and image searches are not repeated.
+        
+        Args:
+            session_id: Session id returned by a previous generation
+            request: Optional instruction and option overrides
+            
+        Returns:
+            Generated post response for the same session
+            
+        Raises:
+            SessionNotFoundError: If the session is missing or expired
+            AppException: If generation fails
+        """
+        session = await self.sessions.get(session_id)
+        if session is None:
+            raise SessionNotFoundError()
+        
+        try:
+            logger.info(f"Regenerating post for session {session_id} ({request.instruction or 'fresh take'})")
+            
+            style = request.style or session.style
+            max_length = request.max_length or session.max_length
+            include_hashtags = (
+                session.include_hashtags if request.include_hashtags is None else request.include_hashtags
+            )
+            
+            generation_result = await self.ai_agent.generate_linkedin_post(
+                topic=session.topic,
+                news_sources=session.news_sources,
+                style=style,
+                max_length=max_length,
+                include_hashtags=include_hashtags,
+                previous_post=session.last_post,
+                refinement=request.instruction
+            )
+            
+            # Later refinements build on the latest draft and options
+            session.style = style
+            session.max_length = max_length
+            session.include_hashtags = include_hashtags
+            session.last_post = generation_result["post_content"]
+            await self.sessions.touch(session)
+            
+            return session.to_response()
+            
+        except Exception as e:
+            logger.error(f"Regeneration failed: {str(e)}")
+            if isinstance(e, AppException):
+                raise
+            else:
+                raise AppException(f"Unexpected error during regeneration: {str(e)}")
+    
+    async def get_session_post(self, session_id: str) -> PostResponse:
+        """
+        Latest post of a session, without any generation.
+        
+        Raises:
+            SessionNotFoundError: If the session is missing or expired
+        """
+        session = await self.sessions.get(session_id)
+        if session is None:
+            raise SessionNotFoundError()
+        return session.to_response()
+    
+    async def _gather_context(self, topic: str) -> Tuple[List[NewsSource], Optional[str]]:
+        """Fetch news sources and image suggestion concurrently."""
+        news_sources, image_suggestion = await asyncio.gather(
+            self._search_news(topic),
+            self.image_service.get_image_suggestion(topic)
+        )
+        
+        if not news_sources:
+            logger.warning(f"No news sources found for topic: {topic}")
+            # Create a fallback news source
+            news_sources = [
+                NewsSource(
+                    title=f"Industry insights on {topic}",
+                    url=f"https://example.com/{topic.lower().replace(' ', '-')}",
+                    source_name="Industry Report",
+                    snippet=f"Latest trends and developments in {topic}"
+                )
+            ]
+        
+        return news_sources, image_suggestion
+    
+    async def _search_news(self, topic: str) -> List[NewsSource]:
+        """Search news, then optionally enrich the top articles with their text."""
+        news_sources = await self.news_service.search_news(topic=topic, limit=5)
+        if settings.article_enrichment and news_sources:
+            news_sources = await self.article_service.enrich(news_sources)
+        return news_sources
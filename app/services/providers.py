@@ -0,0 +1,275 @@
+import threading
+from abc import ABC, abstractmethod
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.schema import BaseMessage, HumanMessage
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
+from serpapi import GoogleSearch
+
+from app.core.config import settings
+from app.core.exceptions import APIKeyError, CassetteMissError
+from app.core.logging import get_logger
+from app.utils.content_store import ContentStore, content_hash
+
+logger = get_logger(__name__)
+
+PROVIDER_MODES = ("live", "record", "replay")
+
+# Search params that never identify a recording (secrets, moving date windows)
+_VOLATILE_SEARCH_PARAMS = ("api_key", "tbs")
+
+
+@dataclass
+class LLMResult:
+    """Normalized result of one chat model call."""
+    content: str
+    model: str
+    usage: Dict[str, int] = field(default_factory=dict)
+    latency: float = 0.0
+    stopped: bool = False  # Stream was cut short by should_stop
+
+
+class LLMProvider(ABC):
+    """Backend interface for chat model calls (blocking; run in an executor)."""
+
+    @abstractmethod
+    def invoke(
+        self,
+        messages: List[BaseMessage],
+        model: str,
+        temperature: float,
+        max_output_tokens: Optional[int] = None
+    ) -> LLMResult:
+        """Run one chat completion."""
+
+    def stream(
+        self,
+        messages: List[BaseMessage],
+        model: str,
+        temperature: float,
+        max_output_tokens: Optional[int],
+        should_stop: Callable[[str], bool]
+    ) -> LLMResult:
+        """
+        Stream a response, stopping as soon as should_stop(text_so_far) is True.
+        
+        Backends without streaming fall back to a single invoke.
+        """
+        return self.invoke(messages, model, temperature, max_output_tokens)
+
+    def ping(self, model: str, temperature: float) -> None:
+        """Cheap call used to warm up the connection of a client that traffic uses."""
+        self.invoke([HumanMessage(content="ping")], model, temperature, max_output_tokens=8)
+
+
+class SearchProvider(ABC):
+    """Backend interface for SerpAPI-style searches (blocking; run in an executor)."""
+
+    @abstractmethod
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one search and return the raw SerpAPI-style payload."""
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through LangChain, with one pooled client per (model, temperature)."""
+
+    def __init__(self, api_key: Optional[str]):
+        if not api_key:
+            raise APIKeyError("GOOGLE_API_KEY is not configured")
+        self.api_key = api_key
+        self._clients: Dict[tuple, ChatGoogleGenerativeAI] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, model: str, temperature: float) -> ChatGoogleGenerativeAI:
+        """Get or create the client for a model configuration."""
+        key = (model, temperature)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                options = {}
+                if settings.llm_thinking_budget is not None:
+                    options["thinking_budget"] = settings.llm_thinking_budget
+                client = ChatGoogleGenerativeAI(
+                    model=model,
+                    google_api_key=self.api_key,
+                    temperature=temperature,
+                    **options
+                )
+                self._clients[key] = client
+            return client
+
+    @staticmethod
+    def _call_options(max_output_tokens: Optional[int]) -> Dict[str, Any]:
+        """Per-call generation options; the token cap varies per request, so it is not part of the client."""
+        if not max_output_tokens:
+            return {}
+        return {"generation_config": {"max_output_tokens": max_output_tokens}}
+
+    def invoke(self, messages, model, temperature, max_output_tokens=None) -> LLMResult:
+        started = time.perf_counter()
+        response = self._client(model, temperature).invoke(messages, **self._call_options(max_output_tokens))
+        return LLMResult(
+            content=response.content,
+            model=model,
+            usage=dict(getattr(response, "usage_metadata", None) or {}),
+            latency=time.perf_counter() - started
+        )
+
+    def stream(self, messages, model, temperature, max_output_tokens, should_stop) -> LLMResult:
+        started = time.perf_counter()
+        text = ""
+        stopped = False
+        usage: Dict[str, int] = {}
+        stream = self._client(model, temperature).stream(messages, **self._call_options(max_output_tokens))
+        try:
+            for chunk in stream:
+                if isinstance(chunk.content, str):
+                    text += chunk.content
+                for name, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+                    if isinstance(value, int):
+                        usage[name] = usage.get(name, 0) + value
+                if should_stop(text):
+                    logger.info(f"Stopping {model} stream early at {len(text)} characters")
+                    stopped = True
+                    break
+        finally:
+            # Closing the generator cancels the remaining upstream generation
+            stream.close()
+        return LLMResult(
+            content=text,
+            model=model,
+            usage=usage,
+            latency=time.perf_counter() - started,
+            stopped=stopped
+        )
+
+
+class SerpAPIProvider(SearchProvider):
+    """Live SerpAPI searches."""
+
+    def __init__(self, api_key: Optional[str]):
+        if not api_key:
+            raise APIKeyError("SERPAPI_API_KEY is not configured")
+        self.api_key = api_key
+
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return GoogleSearch({**params, "api_key": self.api_key}).get_dict()
+
+
+class _Cassette:
+    """Shared record/replay behaviour over a content-addressed store."""
+
+    def __init__(self, store: ContentStore, mode: str, latency_scale: float):
+        self.store = store
+        self.mode = mode
+        self.latency_scale = latency_scale
+
+    def replay(self, key: str, description: str) -> Dict[str, Any]:
+        """Load a recording, sleeping for its (scaled) original latency."""
+        entry = self.store.get_json(key)
+        if entry is None:
+            raise CassetteMissError(f"No recording for {description} ({key[:12]})")
+        if self.latency_scale > 0:
+            time.sleep(entry.get("latency", 0.0) * self.latency_scale)
+        return entry
+
+    def record(self, key: str, entry: Dict[str, Any]) -> None:
+        self.store.put_json(key, entry)
+
+
+class CassetteLLMProvider(LLMProvider):
+    """Records live LLM responses to disk, or replays them without network access."""
+
+    def __init__(self, cassette: _Cassette, inner: Optional[LLMProvider] = None):
+        self.cassette = cassette
+        self.inner = inner
+
+    def _key(self, kind: str, messages, model, temperature, max_output_tokens) -> str:
+        return content_hash({
+            "kind": kind,
+            "model": model,
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+            "messages": [[message.type, message.content] for message in messages]
+        })
+
+    def invoke(self, messages, model, temperature, max_output_tokens=None) -> LLMResult:
+        key = self._key("llm", messages, model, temperature, max_output_tokens)
+        if self.cassette.mode == "replay":
+            return LLMResult(**self.cassette.replay(key, f"LLM call to {model}"))
+
+        result = self.inner.invoke(messages, model, temperature, max_output_tokens)
+        self.cassette.record(key, asdict(result))
+        return result
+
+    def stream(self, messages, model, temperature, max_output_tokens, should_stop) -> LLMResult:
+        # The stop point is derived from max_output_tokens, so it is part of the key
+        key = self._key("llm_stream", messages, model, temperature, max_output_tokens)
+        if self.cassette.mode == "replay":
+            return LLMResult(**self.cassette.replay(key, f"LLM stream from {model}"))
+
+        result = self.inner.stream(messages, model, temperature, max_output_tokens, should_stop)
+        self.cassette.record(key, asdict(result))
+        return result
+
+    def ping(self, model: str, temperature: float) -> None:
+        if self.cassette.mode != "replay":
+            self.inner.ping(model, temperature)
+
+
+class CassetteSearchProvider(SearchProvider):
+    """Records live search responses to disk, or replays them without network access."""
+
+    def __init__(self, cassette: _Cassette, inner: Optional[SearchProvider] = None):
+        self.cassette = cassette
+        self.inner = inner
+
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = content_hash({
+            "kind": "search",
+            "params": {k: v for k, v in params.items() if k not in _VOLATILE_SEARCH_PARAMS}
+        })
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(key, f"search '{params.get('q')}'")["results"]
+
+        started = time.perf_counter()
+        results = self.inner.search(params)
+        self.cassette.record(key, {"results": results, "latency": time.perf_counter() - started})
+        return results
+
+
+def _build_cassette() -> Optional[_Cassette]:
+    """Cassette for the configured provider mode, or None when live."""
+    if settings.provider_mode not in PROVIDER_MODES:
+        raise ValueError(f"provider_mode must be one of: {', '.join(PROVIDER_MODES)}")
+    if settings.provider_mode == "live":
+        return None
+    logger.info(f"Provider mode '{settings.provider_mode}' using cassettes in {settings.cassette_dir}")
+    return _Cassette(
+        ContentStore(settings.cassette_dir, suffix=".json"),
+        settings.provider_mode,
+        settings.replay_latency_scale
+    )
+
+
+def build_llm_provider() -> LLMProvider:
+    """Create the LLM provider for the configured mode."""
+    cassette = _build_cassette()
+    if cassette is None:
+        return GeminiProvider(settings.google_api_key)
+    if cassette.mode == "replay":
+        return CassetteLLMProvider(cassette)
+    return CassetteLLMProvider(cassette, GeminiProvider(settings.google_api_key))
+
+
+def build_search_provider() -> Optional[SearchProvider]:
+    """Create the search provider for the configured mode (None without a SerpAPI key)."""
+    cassette = _build_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        return CassetteSearchProvider(cassette)
+    if not settings.serpapi_api_key:
+        return None
+    live = SerpAPIProvider(settings.serpapi_api_key)
+    return live if cassette is None else CassetteSearchProvider(cassette, live)
@@ -0,0 +1,111 @@
+import asyncio
+import secrets
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.logging import get_logger
+from app.models.response import NewsSource
+from app.models.schema import PostResponse
+from app.utils.content_store import ContentStore, content_hash
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class GenerationSession:
+    """News and image context from a first generation, kept for cheap regeneration."""
+    session_id: str
+    topic: str
+    news_sources: List[NewsSource]
+    image_suggestion: Optional[str]
+    image_thumbnail: Optional[str]
+    style: str
+    max_length: int
+    include_hashtags: bool
+    last_post: str = ""
+    created_at: float = field(default_factory=time.time)
+
+    def to_response(self) -> PostResponse:
+        """The session's latest post as a response."""
+        return PostResponse(
+            topic=self.topic,
+            linkedin_post=self.last_post,
+            news_sources=self.news_sources,
+            image_suggestion=self.image_suggestion,
+            image_thumbnail=self.image_thumbnail,
+            session_id=self.session_id
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form, keeping article excerpts (excluded from API responses)."""
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__}
+        data["news_sources"] = [
+            {**source.model_dump(mode="json"), "excerpt": source.excerpt} for source in self.news_sources
+        ]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GenerationSession":
+        return cls(**{**data, "news_sources": [NewsSource(**source) for source in data["news_sources"]]})
+
+
+class SessionStore:
+    """
+    Generation sessions with a TTL.
+
+    With a state directory the sessions are JSON files that every worker on
+    the host reads, so regenerate and refine work whichever worker answers;
+    without one, or when the directory cannot be written, they are kept in
+    this process only.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, store_dir: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self._memory = TTLCache(ttl_seconds, max_entries)
+        self._store: Optional[ContentStore] = None
+        if store_dir:
+            self._store = ContentStore(str(Path(store_dir) / "sessions"), suffix=".json")
+        self._last_prune = 0.0
+
+    async def create(self, **context) -> GenerationSession:
+        """Create and store a session."""
+        session = GenerationSession(session_id=secrets.token_urlsafe(16), **context)
+        await self.touch(session)
+        return session
+
+    async def get(self, session_id: str) -> Optional[GenerationSession]:
+        """Get a live session."""
+        if self._store is not None:
+            session = await asyncio.to_thread(self._load, session_id)
+            if session is not None:
+                return session
+        return self._memory.get(session_id)
+
+    async def touch(self, session: GenerationSession) -> None:
+        """Store a session again, restarting its TTL."""
+        if self._store is not None:
+            try:
+                await asyncio.to_thread(self._save, session)
+                return
+            except OSError as e:
+                logger.warning(f"Failed to store session {session.session_id}: {str(e)}")
+        self._memory.set(session.session_id, session)
+
+    def _load(self, session_id: str) -> Optional[GenerationSession]:
+        # Session ids come from clients, so they are hashed rather than used as paths
+        record = self._store.get_json(content_hash(session_id))
+        if record is None or time.time() - record.get("updated_at", 0) >= self.ttl_seconds:
+            return None
+        return GenerationSession.from_dict(record["session"])
+
+    def _save(self, session: GenerationSession) -> None:
+        self._store.put_json(
+            content_hash(session.session_id),
+            {"session": session.to_dict(), "updated_at": time.time()}
+        )
+        if time.time() - self._last_prune > self.ttl_seconds:
+            self._last_prune = time.time()
+            self._store.prune(self.ttl_seconds)
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+def content_hash(data: Any) -> str:
+    """SHA-256 of bytes, a string, or canonical JSON for other values."""
+    if isinstance(data, bytes):
+        raw = data
+    elif isinstance(data, str):
+        raw = data.encode()
+    else:
+        raw = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ContentStore:
+    """
+    Content-addressed on-disk store.
+
+    Entries live at ``<root>/<digest[:2]>/<digest><suffix>`` and are written
+    atomically, so concurrent writers of the same digest are harmless.
+    """
+
+    def __init__(self, root: str, suffix: str = ""):
+        self.root = Path(root)
+        self.suffix = suffix
+
+    def path(self, digest: str) -> Path:
+        """Path of the entry for a digest."""
+        return self.root / digest[:2] / f"{digest}{self.suffix}"
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def get_bytes(self, digest: str) -> Optional[bytes]:
+        """Read an entry, or None if missing."""
+        try:
+            return self.path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put_bytes(self, data: bytes, digest: Optional[str] = None) -> str:
+        """Write an entry (keyed by the hash of data unless a digest is given)."""
+        digest = digest or content_hash(data)
+        path = self.path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return digest
+
+    def get_json(self, digest: str) -> Optional[Any]:
+        """Read a JSON entry, or None if missing or unreadable."""
+        data = self.get_bytes(digest)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def put_json(self, digest: str, obj: Any) -> str:
+        """Write a JSON entry under a digest."""
+        return self.put_bytes(json.dumps(obj, default=str).encode(), digest)
+
+    def delete(self, digest: str) -> None:
+        """Remove an entry if present."""
+        self.path(digest).unlink(missing_ok=True)
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete entries not written for max_age_seconds; returns how many were removed."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in self.root.glob(f"*/*{self.suffix}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue  # Removed by another worker
+        return removed
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.admission import AdaptiveConcurrencyLimiter, AdmissionControlMiddleware
+
+
+def make_limiter(initial_limit=10):
+    return AdaptiveConcurrencyLimiter(initial_limit=initial_limit, min_limit=2, max_limit=64, target_latency=1.0)
+
+
+def test_rejects_at_limit():
+    limiter = make_limiter(initial_limit=3)
+    assert all(limiter.try_acquire() for _ in range(3))
+    assert not limiter.try_acquire()
+
+    limiter.release(0.1, True)
+    assert limiter.try_acquire()
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.parametrize("latencies, expected", [
+    ([], 1),         # No samples yet: half the target latency, at least one second
+    ([4.2], 5),      # Rounded up from the latency average
+])
+def test_retry_after(latencies, expected):
+    limiter = make_limiter()
+    for latency in latencies:
+        limiter.try_acquire()
+        limiter.release(latency, True)
+    assert limiter.retry_after() == expected
+
+
+def test_backs_off_once_per_latency_window():
+    limiter = make_limiter(initial_limit=20)
+    for _ in range(20):
+        limiter.try_acquire()
+    time.sleep(0.02)
+
+    # A burst of slow completions admitted before the cut counts as one overload signal
+    for _ in range(20):
+        limiter.release(5.0, True)
+    assert limiter.limit == pytest.approx(18.0)
+
+    # A request admitted after the cut can cut again
+    time.sleep(0.02)
+    limiter.try_acquire()
+    limiter.release(0.01, False)
+    assert limiter.limit == pytest.approx(16.2)
+
+
+def test_failures_back_off_to_floor_over_many_windows():
+    limiter = make_limiter(initial_limit=3)
+    for _ in range(50):
+        limiter.try_acquire()
+        limiter.release(0.0, False)
+    assert limiter.limit == 2.0
+    assert limiter.stats()["failed"] == 50
+
+
+def test_additive_increase_only_while_limit_is_used():
+    limiter = make_limiter(initial_limit=10)
+
+    # One request at a time uses a tenth of the limit: no probing upwards
+    for _ in range(20):
+        limiter.try_acquire()
+        limiter.release(0.1, True)
+    assert limiter.limit == 10.0
+
+    # With the limit half used, each fast completion adds 1/limit
+    for _ in range(6):
+        limiter.try_acquire()
+    limiter.release(0.1, True)
+    assert limiter.limit == pytest.approx(10.1)
+
+
+def test_middleware_sheds_with_retry_after():
+    limiter = make_limiter(initial_limit=2)
+    app = FastAPI()
+
+    @app.post("/posts/generate-post")
+    async def generate():
+        return {"ok": True}
+
+    @app.get("/posts/health")
+    async def health():
+        return {"ok": True}
+
+    app.add_middleware(AdmissionControlMiddleware, limiter=limiter, paths=("/posts/generate-post",))
+    client = TestClient(app)
+
+    limiter.in_flight = 2  # Simulate two generations in progress
+    response = client.post("/posts/generate-post")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(limiter.retry_after())
+    assert response.json()["detail"]["code"] == "OVERLOADED"
+
+    # Unlimited paths pass through even when full
+    assert client.get("/posts/health").status_code == 200
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.http import close_http_client
+from app.models.response import NewsSource
+from app.services.article_agent import ArticleAgent
+from app.utils.content_store import content_hash
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "article_cache_dir", str(tmp_path / "articles"))
+    monkeypatch.setattr(settings, "article_fetch_timeout", 0.5)
+    return ArticleAgent()
+
+
+def run(coro):
+    async def with_client():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+    return asyncio.run(with_client())
+
+
+def source(url):
+    return NewsSource(title=url, url=url, source_name="Wire")
+
+
+def test_bad_url_is_skipped(agent):
+    # httpx.InvalidURL is not an httpx.HTTPError
+    sources = [source("http://[::1"), source("http://127.0.0.1:9/unreachable")]
+    enriched = run(agent.enrich(sources))
+    assert [s.excerpt for s in enriched] == [None, None]
+
+
+def test_cached_excerpt_served_from_disk(agent):
+    url = "https://example.com/gold"
+    agent._store.put_json(content_hash(url), {"url": url, "excerpt": "Gold rose 2%.", "fetched_at": time.time()})
+    assert run(agent.get_excerpt(url)) == "Gold rose 2%."
+
+
+def test_replay_does_not_fetch(agent, monkeypatch):
+    monkeypatch.setattr(settings, "provider_mode", "replay")
+    offline = ArticleAgent()
+
+    async def fetch(url):
+        raise AssertionError("fetched in replay mode")
+
+    monkeypatch.setattr(offline, "_fetch_text", fetch)
+    assert run(offline.get_excerpt("https://example.com/gold")) is None
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.api import routes
+from app.core import usage
+from app.core.exceptions import IdempotencyConflictError, RateLimitError
+from app.core.idempotency import IdempotencyStore, request_fingerprint
+from app.core.usage import UsageTracker
+from app.models.schema import PostResponse
+
+
+def make_factory(calls, delay=0.0, error=None):
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return PostResponse(topic="gold", news_sources=[], linkedin_post=f"Post {len(calls)}")
+    return factory
+
+
+def test_concurrent_retry_attaches_to_running_generation():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+    calls = []
+
+    async def scenario():
+        factory = make_factory(calls, delay=0.05)
+        return await asyncio.gather(
+            store.run("key", "fp", factory),
+            store.run("key", "fp", factory)
+        )
+
+    (first, first_replayed), (second, second_replayed) = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert first is second
+    assert (first_replayed, second_replayed) == (False, True)
+
+
+def test_completed_result_is_replayed():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+    calls = []
+
+    async def scenario():
+        first = await store.run("key", "fp", make_factory(calls))
+        second = await store.run("key", "fp", make_factory(calls))
+        return first, second
+
+    (first, _), (second, replayed) = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert replayed
+    assert second.linkedin_post == first.linkedin_post
+
+
+def test_different_payload_conflicts():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+
+    async def scenario():
+        await store.run("key", request_fingerprint('{"topic": "gold"}'), make_factory([]))
+        await store.run("key", request_fingerprint('{"topic": "silver"}'), make_factory([]))
+
+    with pytest.raises(IdempotencyConflictError):
+        asyncio.run(scenario())
+
+
+def test_failed_generation_is_forgotten():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=10)
+    calls = []
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("key", "fp", make_factory(calls, error=RuntimeError("upstream")))
+        await asyncio.sleep(0)
+        return await store.run("key", "fp", make_factory(calls))
+
+    result, replayed = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert not replayed
+    assert len(store) == 1
+
+
+def test_result_shared_with_other_workers(tmp_path):
+    worker_a = IdempotencyStore(ttl_seconds=60, max_entries=10, store_dir=str(tmp_path))
+    worker_b = IdempotencyStore(ttl_seconds=60, max_entries=10, store_dir=str(tmp_path))
+    calls = []
+
+    async def on_worker_a():
+        result = await worker_a.run("key", "fp", make_factory(calls), PostResponse)
+        await asyncio.sleep(0.05)  # Let the background write finish
+        return result
+
+    async def on_worker_b(fingerprint):
+        return await worker_b.run("key", fingerprint, make_factory(calls), PostResponse)
+
+    (first, _) = asyncio.run(on_worker_a())
+    second, replayed = asyncio.run(on_worker_b("fp"))
+    assert len(calls) == 1
+    assert replayed
+    assert second == first
+
+    with pytest.raises(IdempotencyConflictError):
+        asyncio.run(on_worker_b("other"))
+
+
+def test_shared_result_expires(tmp_path):
+    worker_a = IdempotencyStore(ttl_seconds=0.05, max_entries=10, store_dir=str(tmp_path))
+    worker_b = IdempotencyStore(ttl_seconds=0.05, max_entries=10, store_dir=str(tmp_path))
+    calls = []
+
+    async def scenario():
+        await worker_a.run("key", "fp", make_factory(calls), PostResponse)
+        await asyncio.sleep(0.1)
+        return await worker_b.run("key", "fp", make_factory(calls), PostResponse)
+
+    _, replayed = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert not replayed
+
+
+def test_budget_only_checked_for_new_generations(monkeypatch):
+    monkeypatch.setattr(routes, "idempotency_store", IdempotencyStore(ttl_seconds=60, max_entries=10))
+    tracker = UsageTracker()
+    monkeypatch.setattr(routes, "usage_tracker", tracker)
+    monkeypatch.setattr(usage, "usage_tracker", tracker)
+    http_request = Request({"type": "http", "method": "POST", "path": "/posts/generate-post", "headers": []})
+    calls = []
+
+    async def generate(budget_left):
+        def check_budget(client_id):
+            if not budget_left:
+                raise RateLimitError("over budget")
+        monkeypatch.setattr(tracker, "check_budget", check_budget)
+        return await routes.run_generation(http_request, "key", "{}", "gold", make_factory(calls), PostResponse)
+
+    asyncio.run(generate(budget_left=True))
+    _, replayed, _ = asyncio.run(generate(budget_left=False))
+    assert replayed
+    assert len(calls) == 1
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(routes.run_generation(http_request, "new-key", "{}", "gold", make_factory(calls), PostResponse))
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.core.http import close_http_client
+from app.services.image_agent import ImageAgent
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Image host stand-in with one path per validation case."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, headers, body=b""):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command == "GET" and body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.path == "/photo.jpg":
+            self._reply(200, {"Content-Type": "image/jpeg", "Content-Length": "4096"})
+        elif self.path == "/no-head.png":
+            self._reply(405, {"Content-Length": "0"})
+        elif self.path == "/page.jpg":
+            self._reply(200, {"Content-Type": "text/html", "Content-Length": "4096"})
+        elif self.path == "/slow.jpg":
+            time.sleep(1.0)
+            self._reply(200, {"Content-Type": "image/jpeg", "Content-Length": "4096"})
+        else:
+            self._reply(404, {"Content-Length": "0"})
+
+    def do_GET(self):
+        if self.path == "/no-head.png" and self.headers.get("Range") == "bytes=0-0":
+            self._reply(206, {
+                "Content-Type": "image/png",
+                "Content-Range": "bytes 0-0/5000",
+                "Content-Length": "1"
+            }, b"\x89")
+        else:
+            self._reply(404, {"Content-Length": "0"})
+
+
+@pytest.fixture(scope="module")
+def image_host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(settings, "image_validation_timeout", 0.5)
+    return ImageAgent(search_provider=None)
+
+
+def run(coro):
+    async def with_client():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+    return asyncio.run(with_client())
+
+
+def test_head_ok(agent, image_host):
+    assert run(agent._is_valid_image(f"{image_host}/photo.jpg"))
+
+
+def test_head_not_allowed_falls_back_to_range_get(agent, image_host):
+    assert run(agent._is_valid_image(f"{image_host}/no-head.png"))
+
+
+def test_wrong_content_type_rejected(agent, image_host):
+    assert not run(agent._is_valid_image(f"{image_host}/page.jpg"))
+
+
+def test_missing_image_rejected(agent, image_host):
+    assert not run(agent._is_valid_image(f"{image_host}/missing.jpg"))
+
+
+def test_race_returns_first_valid_candidate(agent, image_host):
+    candidates = [
+        {"original": f"{image_host}/slow.jpg"},
+        {"original": f"{image_host}/page.jpg"},
+        {"original": f"{image_host}/photo.jpg"}
+    ]
+    winner = run(agent._race_candidates(candidates))
+    assert winner["original"] == f"{image_host}/photo.jpg"
+
+
+def test_race_deadline(agent, image_host):
+    started = time.perf_counter()
+    winner = run(agent._race_candidates([{"original": f"{image_host}/slow.jpg"}]))
+    assert winner is None
+    assert time.perf_counter() - started < 0.9
+
+
+def test_replay_skips_validation(monkeypatch):
+    monkeypatch.setattr(settings, "provider_mode", "replay")
+    agent = ImageAgent(search_provider=None)
+    candidates = [{"original": "http://127.0.0.1:9/unreachable.jpg"}]
+    assert run(agent._race_candidates(candidates)) is candidates[0]
@@ -0,0 +1,132 @@
+import asyncio
+import math
+
+import pytest
+
+from app.core.config import settings
+from app.core.executors import shutdown_executors
+from app.services.linkedin_agent import HASHTAG_TOKEN_ALLOWANCE, AIAgent
+from app.services.providers import LLMProvider, LLMResult
+
+SENTENCE = "Gold prices climbed again this week as buyers returned. "
+
+
+class FakeLLM(LLMProvider):
+    """Streams a fixed reply word by word, honouring should_stop like GeminiProvider."""
+
+    def __init__(self, text, hashtag_reply="#Fallback"):
+        self.text = text
+        self.hashtag_reply = hashtag_reply
+        self.calls = []
+
+    def invoke(self, messages, model, temperature, max_output_tokens=None):
+        self.calls.append("invoke")
+        return LLMResult(content=self.hashtag_reply, model=model)
+
+    def stream(self, messages, model, temperature, max_output_tokens, should_stop):
+        self.calls.append("stream")
+        text = ""
+        for word in self.text.split(" "):
+            text += word + " "
+            if should_stop(text):
+                return LLMResult(content=text, model=model, stopped=True)
+        return LLMResult(content=text, model=model)
+
+
+@pytest.fixture
+def agent():
+    yield AIAgent(FakeLLM(""))
+    shutdown_executors()
+
+
+def generate(agent, text, max_length=300, include_hashtags=True):
+    agent.llm_provider = FakeLLM(text)
+    return asyncio.run(agent.generate_linkedin_post(
+        "gold", [], max_length=max_length, include_hashtags=include_hashtags
+    ))
+
+
+def test_max_output_tokens(agent, monkeypatch):
+    monkeypatch.setattr(settings, "llm_thinking_budget", 0)
+    base = math.ceil(1000 / settings.llm_chars_per_token * settings.llm_output_token_margin)
+    assert agent._max_output_tokens(1000, include_hashtags=False) == base
+    assert agent._max_output_tokens(1000, include_hashtags=True) == base + HASHTAG_TOKEN_ALLOWANCE
+
+
+def test_max_output_tokens_includes_thinking_budget(agent, monkeypatch):
+    monkeypatch.setattr(settings, "llm_thinking_budget", 0)
+    without = agent._max_output_tokens(1000, False)
+    monkeypatch.setattr(settings, "llm_thinking_budget", 256)
+    assert agent._max_output_tokens(1000, False) == without + 256
+
+
+def test_stop_only_after_limit_at_sentence_end(agent):
+    should_stop = agent._stop_after_limit(60)
+    assert not should_stop(SENTENCE)                          # Under the limit
+    assert not should_stop(SENTENCE + "Buyers are back in")   # Past the limit, mid-sentence
+    assert should_stop(SENTENCE + "Buyers are back in force.")
+
+
+def test_stop_ignores_leading_hashtags(agent):
+    should_stop = agent._stop_after_limit(60)
+    hashtags = "#Gold #Markets #Investing #Commodities #Finance\n\n"
+    assert not should_stop(hashtags + SENTENCE)
+    assert should_stop(hashtags + SENTENCE + "More follows.")
+
+
+def test_clean_post_skips_leading_hashtags(agent):
+    content = "#Gold #Markets\n\nGold is up.\n\nWhat next?\n#Trailing"
+    assert agent._clean_post_content(content) == "Gold is up.\nWhat next?"
+
+
+def test_clean_post_keeps_body_without_hashtags(agent):
+    assert agent._clean_post_content("Gold is up.\nWhat next?") == "Gold is up.\nWhat next?"
+
+
+def test_trim_prefers_sentence_boundary(agent):
+    content = SENTENCE * 3
+    trimmed = agent._trim_to_length(content, 120)
+    assert trimmed == (SENTENCE * 2).rstrip()
+
+
+def test_trim_without_sentence_boundary_drops_partial_word(agent):
+    content = "word " * 50
+    trimmed = agent._trim_to_length(content, 42)
+    assert len(trimmed) <= 42
+    assert trimmed.split() == ["word"] * 8
+
+
+def test_trim_leaves_short_posts(agent):
+    assert agent._trim_to_length("Short post.", 100) == "Short post."
+
+
+def test_hashtags_first_output_survives_early_stop(agent, monkeypatch):
+    monkeypatch.setattr(settings, "llm_stream_posts", True)
+    result = generate(agent, "#Gold #Markets #Finance\n\n" + SENTENCE * 20)
+
+    assert agent.llm_provider.calls == ["stream"]
+    assert result["hashtags"] == ["#Gold", "#Markets", "#Finance"]
+    assert not result["post_content"].startswith("#")
+    assert result["character_count"] <= 300
+
+
+def test_stopped_stream_without_hashtags_makes_no_second_call(agent, monkeypatch):
+    monkeypatch.setattr(settings, "llm_stream_posts", True)
+    result = generate(agent, SENTENCE * 20 + "\n#Gold #Markets")
+
+    assert agent.llm_provider.calls == ["stream"]
+    assert result["hashtags"][0] == "#gold"
+
+
+def test_unstopped_post_without_hashtags_uses_fallback_call(agent, monkeypatch):
+    monkeypatch.setattr(settings, "llm_stream_posts", True)
+    result = generate(agent, "Short post about gold.")
+
+    assert agent.llm_provider.calls == ["stream", "invoke"]
+    assert result["hashtags"] == ["#Fallback"]
+
+
+def test_prompt_asks_for_hashtags_first_when_streaming(agent):
+    assert "hashtags on the first line" in agent._create_post_prompt("gold", [], "casual", 500, True, hashtags_first=True)
+    assert "at the end" in agent._create_post_prompt("gold", [], "casual", 500, True, hashtags_first=False)
+    assert "Do not include hashtags" in agent._create_post_prompt("gold", [], "casual", 500, False, hashtags_first=True)
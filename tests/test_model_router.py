@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.model_router import ModelRouter
+
+PRIMARY = "primary-model"
+LIGHT = "light-model"
+
+
+def make_router(max_age=300.0, primary=PRIMARY, light=LIGHT):
+    return ModelRouter(
+        primary_model=primary,
+        light_model=light,
+        short_post_chars=800,
+        window=50,
+        max_age=max_age,
+        min_samples=5,
+        max_error_rate=0.5,
+        latency_budget=10.0
+    )
+
+
+def models(router, task):
+    return [route.model for route in router.candidates(task)]
+
+
+@pytest.mark.parametrize("style, max_length, task", [
+    ("professional", 800, "short_post"),
+    ("casual", 2000, "long_post"),
+    ("thought-leadership", 500, "long_post"),
+])
+def test_post_task(style, max_length, task):
+    assert make_router().post_task(style, max_length) == task
+
+
+def test_candidates_prefer_task_model():
+    router = make_router()
+    assert models(router, "hashtags") == [LIGHT, PRIMARY]
+    assert models(router, "short_post") == [LIGHT, PRIMARY]
+    assert models(router, "long_post") == [PRIMARY, LIGHT]
+
+
+def test_candidate_temperatures():
+    router = make_router()
+    assert {route.temperature for route in router.candidates("hashtags")} == {settings.llm_hashtag_temperature}
+    assert {route.temperature for route in router.candidates("long_post")} == {settings.temperature}
+
+
+def test_same_model_is_not_duplicated():
+    router = make_router(light=PRIMARY)
+    assert models(router, "short_post") == [PRIMARY]
+
+
+def test_not_degraded_below_min_samples():
+    router = make_router()
+    for _ in range(4):
+        router.record(LIGHT, 1.0, False)
+    assert not router.is_degraded(LIGHT)
+
+
+def test_degraded_on_error_rate():
+    router = make_router()
+    for _ in range(5):
+        router.record(LIGHT, 1.0, False)
+    assert router.is_degraded(LIGHT)
+    assert models(router, "short_post") == [PRIMARY, LIGHT]
+
+
+def test_degraded_on_latency():
+    router = make_router()
+    for _ in range(5):
+        router.record(PRIMARY, 30.0, True)
+    assert router.is_degraded(PRIMARY)
+    assert models(router, "long_post") == [LIGHT, PRIMARY]
+
+
+def test_degraded_model_recovers_when_samples_expire():
+    router = make_router(max_age=0.05)
+    for _ in range(5):
+        router.record(LIGHT, 1.0, False)
+    for _ in range(1000):
+        router.record(PRIMARY, 1.0, True)
+    assert router.is_degraded(LIGHT)
+
+    time.sleep(0.1)
+    assert not router.is_degraded(LIGHT)
+    assert models(router, "short_post") == [LIGHT, PRIMARY]
+    assert router.stats()[LIGHT]["samples"] == 0
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import ExecutorSaturatedError
+from app.core.executors import shutdown_executors
+from app.models.response import NewsSource
+from app.services import news_agent
+from app.services.news_agent import NewsSearchAgent
+from app.services.news_store import NewsArticleStore
+from app.services.providers import SearchProvider
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+class FakeSearch(SearchProvider):
+    """Search provider returning queued payloads and recording the params it saw."""
+
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.calls = []
+
+    def search(self, params):
+        self.calls.append(params)
+        return self.payloads.pop(0)
+
+
+def source(url, published=None):
+    return NewsSource(title=url, url=url, source_name="Wire", snippet="", published_date=published)
+
+
+def news_payload(*urls):
+    return {"news_results": [{"title": url, "link": url, "iso_date": NOW.isoformat() + "Z"} for url in urls]}
+
+
+@pytest.fixture
+def agent():
+    yield NewsSearchAgent(search_provider=FakeSearch())
+    shutdown_executors()
+
+
+@pytest.mark.parametrize("gap, expected", [
+    (timedelta(minutes=30), "qdr:h"),
+    (timedelta(hours=5), "qdr:d"),
+    (timedelta(days=3), "qdr:w"),
+])
+def test_time_filter_covers_gap(agent, gap, expected):
+    assert agent._time_filter(NOW - gap, NOW) == expected
+
+
+def test_time_filter_full_window_without_previous_fetch(agent):
+    start = NOW - timedelta(days=settings.news_search_days)
+    assert agent._time_filter(None, NOW) == f"cdr:1,cd_min:{start:%m/%d/%Y},cd_max:{NOW:%m/%d/%Y}"
+
+
+def test_time_filter_full_window_after_long_gap(agent):
+    assert agent._time_filter(NOW - timedelta(days=30), NOW) == agent._time_filter(None, NOW)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("3 hours ago", timedelta(hours=3)),
+    ("an hour ago", timedelta(hours=1)),
+    ("45 mins ago", timedelta(minutes=45)),
+    ("2 weeks ago", timedelta(weeks=2)),
+    ("yesterday", timedelta(days=1)),
+])
+def test_parse_relative_date(agent, value, expected):
+    parsed = agent._parse_date(value)
+    assert abs(datetime.utcnow() - expected - parsed) < timedelta(seconds=5)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-09-18", datetime(2025, 9, 18)),
+    ("2025-09-18T10:30:00Z", datetime(2025, 9, 18, 10, 30)),
+    ("Sep 18, 2025", datetime(2025, 9, 18)),
+    ("10/19/2026, 07:00 AM, +0200 UTC", datetime(2026, 10, 19, 5, 0)),
+])
+def test_parse_absolute_date(agent, value, expected):
+    assert agent._parse_date(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "not a date"])
+def test_parse_invalid_date(agent, value):
+    assert agent._parse_date(value) is None
+
+
+def test_merge_dedupes_by_url_and_keeps_first_seen():
+    store = NewsArticleStore(window_days=7, max_topics=10)
+    store.merge("Gold", [source("a")], NOW - timedelta(hours=2))
+    entry = store.merge("gold ", [source("a"), source("b")], NOW)
+
+    assert set(entry.articles) == {"a", "b"}
+    assert entry.articles["a"].first_seen == NOW - timedelta(hours=2)
+    assert entry.last_fetched == NOW
+
+
+def test_merge_ages_out_old_articles():
+    store = NewsArticleStore(window_days=7, max_topics=10)
+    entry = store.merge("gold", [source("old", NOW - timedelta(days=8)), source("new", NOW)], NOW)
+    assert set(entry.articles) == {"new"}
+
+
+def test_recent_is_newest_first():
+    store = NewsArticleStore(window_days=7, max_topics=10)
+    store.merge("gold", [
+        source("older", NOW - timedelta(days=2)),
+        source("newest", NOW - timedelta(hours=1)),
+        source("middle", NOW - timedelta(days=1)),
+    ], NOW)
+    assert [s.url for s in store.recent("gold", 2)] == ["newest", "middle"]
+
+
+@pytest.mark.parametrize("failed", [{}, {"error": "Google hasn't returned any results for this query."}])
+def test_failed_search_does_not_advance_last_fetched(agent, failed):
+    agent.search_provider = FakeSearch(failed, news_payload("a"))
+
+    assert asyncio.run(agent.search_news("gold")) == []
+    assert agent.store.get("gold") is None
+
+    # The next call searches the full window again instead of serving an empty cache
+    results = asyncio.run(agent.search_news("gold"))
+    assert [s.url for s in results] == ["a"]
+    first, second = agent.search_provider.calls
+    assert first["tbs"] == second["tbs"] == agent._time_filter(None, datetime.utcnow())
+
+
+def test_refresh_within_interval_uses_store(agent):
+    agent.search_provider = FakeSearch(news_payload("a"))
+    asyncio.run(agent.search_news("gold"))
+    results = asyncio.run(agent.search_news("gold"))
+
+    assert [s.url for s in results] == ["a"]
+    assert len(agent.search_provider.calls) == 1
+
+
+def test_saturated_search_pool_is_not_a_search_error(agent, monkeypatch):
+    class SaturatedPool:
+        async def run(self, fn, *args, fallback=None):
+            raise ExecutorSaturatedError("search")
+
+    monkeypatch.setattr(news_agent, "get_executor", lambda name: SaturatedPool())
+    with pytest.raises(ExecutorSaturatedError):
+        asyncio.run(agent.search_news("gold"))
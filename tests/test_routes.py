@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.api.routes import router
+from app.core.admission import AdaptiveConcurrencyLimiter
+from app.core.config import settings
+from app.core.executors import shutdown_executors
+from app.models.response import NewsSource
+from app.services.post_generator import PostGeneratorService
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    # Replay mode builds the service without API keys or network access
+    monkeypatch.setattr(settings, "provider_mode", "replay")
+    monkeypatch.setattr(settings, "cassette_dir", str(tmp_path / "cassettes"))
+    monkeypatch.setattr(settings, "state_dir", str(tmp_path / "state"))
+    yield PostGeneratorService()
+    shutdown_executors()
+
+
+@pytest.fixture
+def client(service):
+    app = FastAPI()
+    app.include_router(router)
+    app.state.post_service = service
+    return TestClient(app)
+
+
+def create_session(service, last_post="First draft."):
+    return asyncio.run(service.sessions.create(
+        topic="gold",
+        news_sources=[NewsSource(title="Gold rises", url="https://example.com/gold", source_name="Wire")],
+        image_suggestion=None,
+        image_thumbnail=None,
+        style="professional",
+        max_length=800,
+        include_hashtags=True,
+        last_post=last_post
+    ))
+
+
+def test_get_session_post(client, service):
+    session = create_session(service)
+    response = client.get(f"/posts/sessions/{session.session_id}")
+
+    assert response.status_code == 200
+    assert response.json()["linkedin_post"] == "First draft."
+    assert response.headers["etag"].startswith('W/"')
+
+
+def test_get_session_post_not_modified(client, service):
+    session = create_session(service)
+    etag = client.get(f"/posts/sessions/{session.session_id}").headers["etag"]
+
+    response = client.get(f"/posts/sessions/{session.session_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_get_session_post_changed_after_refine(client, service):
+    session = create_session(service)
+    etag = client.get(f"/posts/sessions/{session.session_id}").headers["etag"]
+
+    session.last_post = "Second draft."
+    asyncio.run(service.sessions.touch(session))
+
+    response = client.get(f"/posts/sessions/{session.session_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["linkedin_post"] == "Second draft."
+
+
+def test_get_unknown_session(client):
+    response = client.get("/posts/sessions/missing")
+    assert response.status_code == 404
+    assert response.json()["detail"]["code"] == "SESSION_NOT_FOUND"
+
+
+def test_websocket_message_shed_when_overloaded(client, service, monkeypatch):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=1, target_latency=20.0)
+    limiter.try_acquire()
+    monkeypatch.setattr(routes, "admission_limiter", limiter)
+    session = create_session(service)
+
+    with client.websocket_connect(f"/posts/sessions/{session.session_id}/ws") as websocket:
+        websocket.send_json({"instruction": "shorter"})
+        reply = websocket.receive_json()
+
+    assert reply["code"] == "OVERLOADED"
+    assert reply["details"]["retry_after"] >= 1
+    assert limiter.stats()["rejected"] == 1
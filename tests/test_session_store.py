@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from app.models.response import NewsSource
+from app.services.session_store import SessionStore
+
+
+def session_context():
+    return dict(
+        topic="gold",
+        news_sources=[NewsSource(title="Gold rises", url="https://example.com/gold", excerpt="Gold rose 2%.")],
+        image_suggestion="https://example.com/gold.jpg",
+        image_thumbnail=None,
+        style="professional",
+        max_length=800,
+        include_hashtags=True,
+        last_post="First draft."
+    )
+
+
+def test_session_shared_with_other_workers(tmp_path):
+    worker_a = SessionStore(ttl_seconds=60, max_entries=10, store_dir=str(tmp_path))
+    worker_b = SessionStore(ttl_seconds=60, max_entries=10, store_dir=str(tmp_path))
+
+    session = asyncio.run(worker_a.create(**session_context()))
+    loaded = asyncio.run(worker_b.get(session.session_id))
+
+    assert loaded == session
+    assert loaded.news_sources[0].excerpt == "Gold rose 2%."
+
+
+def test_refined_session_visible_to_other_workers(tmp_path):
+    worker_a = SessionStore(ttl_seconds=60, max_entries=10, store_dir=str(tmp_path))
+    worker_b = SessionStore(ttl_seconds=60, max_entries=10, store_dir=str(tmp_path))
+    session = asyncio.run(worker_a.create(**session_context()))
+
+    session.last_post = "Second draft."
+    asyncio.run(worker_b.touch(session))
+
+    assert asyncio.run(worker_a.get(session.session_id)).last_post == "Second draft."
+
+
+def test_session_expires(tmp_path):
+    store = SessionStore(ttl_seconds=0.05, max_entries=10, store_dir=str(tmp_path))
+    session = asyncio.run(store.create(**session_context()))
+    time.sleep(0.1)
+    assert asyncio.run(store.get(session.session_id)) is None
+
+
+def test_unknown_session_id_is_not_a_path(tmp_path):
+    store = SessionStore(ttl_seconds=60, max_entries=10, store_dir=str(tmp_path / "state"))
+    (tmp_path / "secret.json").write_text('{"session": {}}')
+    assert asyncio.run(store.get("../../secret")) is None
+
+
+def test_without_state_dir_sessions_stay_in_process():
+    store = SessionStore(ttl_seconds=60, max_entries=10)
+    session = asyncio.run(store.create(**session_context()))
+    assert asyncio.run(store.get(session.session_id)) is session
+    assert asyncio.run(SessionStore(ttl_seconds=60, max_entries=10).get(session.session_id)) is None
@@ -0,0 +1,62 @@
+import pytest
+from starlette.requests import Request
+
+from app.api.routes import get_client_id
+from app.core.config import settings
+from app.core.exceptions import RateLimitError
+from app.core.usage import RequestUsage, UsageTracker
+
+
+def request_usage(client_id, topic="gold", tokens=100):
+    usage = RequestUsage(topic=topic, client_id=client_id)
+    usage.add_llm_call("short_post", "gemini-2.5-flash", {"input_tokens": tokens, "output_tokens": tokens})
+    return usage
+
+
+@pytest.fixture
+def workers(tmp_path):
+    return UsageTracker(store_dir=str(tmp_path)), UsageTracker(store_dir=str(tmp_path))
+
+
+def test_usage_aggregated_across_workers(workers):
+    worker_a, worker_b = workers
+    worker_a.record(request_usage("alice"))
+    worker_b.record(request_usage("alice", topic="Silver"))
+    worker_b.record(request_usage("bob"))
+
+    stats = worker_a.stats("1h")
+    assert stats["totals"]["requests"] == 3
+    assert stats["by_client"]["alice"]["input_tokens"] == 200
+    assert set(stats["by_topic"]) == {"gold", "silver"}
+    assert stats["by_model"]["gemini-2.5-flash"]["calls"] == 3
+    assert worker_b.client_tokens("alice", 3600) == 400
+
+
+def test_budget_counts_usage_from_other_workers(workers, monkeypatch):
+    worker_a, worker_b = workers
+    monkeypatch.setattr(settings, "client_token_budget_per_hour", 300)
+    worker_a.record(request_usage("alice"))
+    worker_b.check_budget("alice")
+
+    worker_a.record(request_usage("alice"))
+    with pytest.raises(RateLimitError):
+        worker_b.check_budget("alice")
+    worker_b.check_budget("bob")
+
+
+def test_without_state_dir_usage_stays_in_process():
+    tracker = UsageTracker()
+    tracker.record(request_usage("alice"))
+    assert tracker.client_tokens("alice", 3600) == 200
+    assert UsageTracker().client_tokens("alice", 3600) == 0
+
+
+def test_client_id_header_ignored_when_untrusted(monkeypatch):
+    http_request = Request({
+        "type": "http", "method": "POST", "path": "/posts/generate-post",
+        "headers": [(b"x-client-id", b"alice")], "client": ("203.0.113.7", 5000)
+    })
+    assert get_client_id(http_request) == "alice"
+
+    monkeypatch.setattr(settings, "trust_client_id_header", False)
+    assert get_client_id(http_request) == "203.0.113.7"